@@ -0,0 +1,164 @@
+# alarmes.py – MOTOR DE ALARMES COM HISTERESE E LIMITE DE TAXA
+import numpy as np
+
+NIVEIS = ("NORMAL", "AVISO", "CRITICO")
+NORMAL, AVISO, CRITICO = range(3)
+
+# Cada regra dispara quando a variável passa do limite por duracao minutos
+# seguidos e só normaliza depois de voltar histerese °C para dentro da faixa
+# por normalizacao minutos seguidos.
+REGRAS_PADRAO = [
+    {"nome": "TEMP ALTA", "variavel": "T", "sentido": "acima", "limite": 26.0,
+     "histerese": 0.5, "duracao": 3, "normalizacao": 5, "nivel": AVISO},
+    {"nome": "TEMP CRITICA ALTA", "variavel": "T", "sentido": "acima", "limite": 28.0,
+     "histerese": 0.5, "duracao": 1, "normalizacao": 5, "nivel": CRITICO},
+    {"nome": "TEMP BAIXA", "variavel": "T", "sentido": "abaixo", "limite": 18.0,
+     "histerese": 0.5, "duracao": 3, "normalizacao": 5, "nivel": AVISO},
+    {"nome": "TEMP CRITICA BAIXA", "variavel": "T", "sentido": "abaixo", "limite": 16.0,
+     "histerese": 0.5, "duracao": 1, "normalizacao": 5, "nivel": CRITICO},
+]
+
+# Intervalo mínimo (minutos) entre duas publicações da mesma sala
+INTERVALO_PADRAO = 10
+
+
+class MotorAlarmes:
+    """
+    Avalia as regras de alarme para N salas de uma vez (arrays (N,)) e
+    devolve apenas as transições de nível (NORMAL/AVISO/CRITICO).
+
+    Por sala, o estado publicado só muda quando:
+      - o nível sobe (escalonamento sai na hora, sem limite de taxa), ou
+      - passou intervalo minutos desde a última publicação.
+    Transições seguradas pelo limite de taxa não se perdem: assim que o
+    intervalo vence, o nível atual (se ainda diferente) é publicado.
+    """
+    def __init__(self, n=1, regras=None, intervalo=INTERVALO_PADRAO):
+        self.n = n
+        self.regras = list(regras or REGRAS_PADRAO)
+        self.intervalo = intervalo
+
+        nr = len(self.regras)
+        sinal = np.array([1.0 if r["sentido"] == "acima" else -1.0 for r in self.regras])
+        self.sinal = sinal[:, None]
+        self.disparo = (sinal * [r["limite"] for r in self.regras])[:, None]
+        self.liberacao = self.disparo - np.array([[r["histerese"]] for r in self.regras])
+        self.duracao = np.array([[r["duracao"]] for r in self.regras])
+        self.normalizacao = np.array([[r["normalizacao"]] for r in self.regras])
+        self.nivel_regra = np.array([[r["nivel"]] for r in self.regras])
+        self.variaveis = sorted({r["variavel"] for r in self.regras})
+        self.var_regra = [self.variaveis.index(r["variavel"]) for r in self.regras]
+
+        self.x = np.empty((nr, n))
+        self.violando = np.empty((nr, n), dtype=bool)
+        self.liberado = np.empty((nr, n), dtype=bool)
+        self.niveis = np.empty((nr, n), dtype=np.intp)
+        self.limpar()
+
+    def limpar(self):
+        """Zera o estado (nova simulação): todas as salas em NORMAL."""
+        nr, n = len(self.regras), self.n
+        self.ativo = np.zeros((nr, n), dtype=bool)
+        self.cont_disparo = np.zeros((nr, n), dtype=np.intp)
+        self.cont_liberacao = np.zeros((nr, n), dtype=np.intp)
+        self.nivel = np.zeros(n, dtype=np.intp)
+        self.regra = np.full(n, -1, dtype=np.intp)
+        self.publicado = np.zeros(n, dtype=np.intp)
+        self.t_publicado = np.full(n, -np.inf)
+        self.avaliacoes = 0
+        self.eventos = 0
+        self.adiados = 0
+
+    def avaliar(self, t, **medidas):
+        """
+        Um minuto de avaliação. medidas: arrays (N,) por variável (ex.: T=...).
+        Retorna a lista de transições publicáveis (dicts), quase sempre vazia.
+        """
+        x = self.x
+        for i, k in enumerate(self.var_regra):
+            x[i] = medidas[self.variaveis[k]]
+        # Com o sinal, toda regra vira "dispara se x > disparo"
+        np.multiply(x, self.sinal, out=x)
+        np.greater(x, self.disparo, out=self.violando)
+        np.less_equal(x, self.liberacao, out=self.liberado)
+
+        # Contadores de minutos consecutivos (zeram fora da condição)
+        self.cont_disparo += 1
+        self.cont_disparo *= self.violando
+        self.cont_liberacao += 1
+        self.cont_liberacao *= self.liberado
+
+        # Dentro da banda de histerese nenhum contador avança: o estado se mantém
+        self.ativo |= self.cont_disparo >= self.duracao
+        self.ativo &= self.cont_liberacao < self.normalizacao
+
+        np.multiply(self.ativo, self.nivel_regra, out=self.niveis)
+        np.argmax(self.niveis, axis=0, out=self.regra)
+        np.max(self.niveis, axis=0, out=self.nivel)
+        self.avaliacoes += 1
+
+        # Publica só transições, respeitando o limite de taxa por sala
+        mudou = self.nivel != self.publicado
+        if not mudou.any():
+            return []
+        liberado = (t - self.t_publicado >= self.intervalo) | (self.nivel > self.publicado)
+        emitir = mudou & liberado
+        self.adiados += int(np.count_nonzero(mudou & ~emitir))
+
+        eventos = []
+        for sala in np.flatnonzero(emitir):
+            nivel = int(self.nivel[sala])
+            regra = self.regras[self.regra[sala]]
+            eventos.append({
+                "sala": int(sala),
+                "minuto": t,
+                "nivel": NIVEIS[nivel],
+                "anterior": NIVEIS[self.publicado[sala]],
+                "msg": regra["nome"] if nivel else "NORMAL",
+                "val": round(float(np.atleast_1d(medidas[regra["variavel"]])[sala]), 2),
+            })
+        self.publicado[emitir] = self.nivel[emitir]
+        self.t_publicado[emitir] = t
+        self.eventos += len(eventos)
+        return eventos
+
+    def estatisticas(self):
+        return {
+            "avaliacoes": self.avaliacoes,
+            "eventos": self.eventos,
+            "adiados": self.adiados,
+            "salas_em_alarme": int(np.count_nonzero(self.publicado)),
+        }
+
+
+def avaliar_historico(hist, motor=None, variavel="T"):
+    """
+    Passa um histórico (horizonte, N) — ex.: o T de nucleo.simular_lote —
+    pelo motor e devolve a lista de eventos publicados.
+    """
+    motor = motor or MotorAlarmes(hist.shape[1])
+    eventos = []
+    for t in range(hist.shape[0]):
+        eventos.extend(motor.avaliar(t, **{variavel: hist[t]}))
+    return eventos
+
+
+if __name__ == "__main__":
+    # Tráfego de alertas: 1 mensagem por minuto fora de 18–26 °C x transições
+    import sys
+    from nucleo import simular_lote
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rng = np.random.default_rng(0)
+    sp = rng.choice([16, 22, 26, 32], n)
+    erro = rng.uniform(-5, 5, n)
+    hist_T, _ = simular_lote(sp, erro, semente=0)
+
+    ingenuo = int(np.count_nonzero((hist_T < 18) | (hist_T > 26)))
+    motor = MotorAlarmes(n)
+    eventos = avaliar_historico(hist_T, motor)
+    print(f"{n} salas x {hist_T.shape[0]} min")
+    print(f"Alertas por minuto (antigo): {ingenuo}")
+    print(f"Transições publicadas:       {len(eventos)} "
+          f"({ingenuo / max(1, len(eventos)):.0f}x menos)")
+    print(motor.estatisticas())
@@ -0,0 +1,223 @@
+# especificacao.py – CONTROLADOR FUZZY A PARTIR DE ARQUIVO DECLARATIVO
+import os
+import json
+import hashlib
+import pickle
+
+import numpy as np
+import skfuzzy as fuzz
+from skfuzzy import control as ctrl
+
+# Entradas que os motores recebem, nesta ordem (e, de, Text, Qest): a
+# simulação e a GUI passam os valores por posição, então a especificação
+# precisa declarar exatamente estas variáveis, na mesma ordem
+ENTRADAS = ("erro", "de", "text", "qest")
+
+PASTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_fuzzy")
+
+# Versão de compilar()/criar_sistema_skfuzzy(): entra na chave do cache, então
+# incrementar ao mudar como as tabelas ou o sistema são gerados invalida os
+# arquivos antigos (a versão do skfuzzy também entra, por causa do pickle)
+VERSAO_COMPILADOR = 3
+
+# Tabelas já compiladas nesta execução, indexadas por hash e versão
+_compilados = {}
+
+
+class TabelasFuzzy:
+    """
+    Controlador compilado (só numpy): universos, matrizes de MFs por
+    variável, regras e singletons da saída. É o que os motores vetorizados
+    (fuzzy_lote, NucleoPasso) consomem; o sistema skfuzzy é montado à parte,
+    só quando necessário (criar_sistema_skfuzzy).
+    """
+    def __init__(self, meta, arrays, hash_):
+        self.hash = hash_
+        self.skfuzzy = None
+        self.meta = meta
+        self.nome = meta["nome"]
+        self.entradas = [v["nome"] for v in meta["entradas"]]
+        self.saida = meta["saida"]["nome"]
+        self.variaveis = {v["nome"]: v for v in meta["entradas"] + [meta["saida"]]}
+        self.termos = {nome: [t["nome"] for t in v["termos"]]
+                       for nome, v in self.variaveis.items()}
+        self.universos = {nome: arrays[f"univ_{nome}"] for nome in self.variaveis}
+        self.mfs = {nome: arrays[f"mf_{nome}"] for nome in self.variaveis}
+        self.regras = meta["regras_debug"]
+        self.centros_saida = arrays["centros_saida"]
+        self.picos_saida = arrays["picos_saida"]
+
+    def mf(self, var, termo):
+        return self.mfs[var][self.termos[var].index(termo)]
+
+    def rotulo_termo(self, var, termo):
+        return self.variaveis[var]["termos"][self.termos[var].index(termo)]["rotulo"]
+
+
+# --- LEITURA E HASH ---
+def ler_spec(origem):
+    """origem: caminho de um .json ou o próprio dicionário da especificação."""
+    if isinstance(origem, dict):
+        return origem
+    with open(origem, encoding="utf-8") as f:
+        return json.load(f)
+
+def hash_spec(spec):
+    # JSON canônico: espaços e ordem das chaves não invalidam o cache
+    texto = json.dumps(spec, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+
+# --- COMPILAÇÃO ---
+def _descricao(spec_vars, ants, out, saida):
+    partes = [f"{spec_vars[v]['rotulo']} é {_rotulo(spec_vars[v], t)}" for v, t in ants]
+    return f"Se {' e '.join(partes)} então {saida['rotulo']} é {_rotulo(saida, out)}"
+
+def _rotulo(var, termo):
+    for t in var["termos"]:
+        if t["nome"] == termo:
+            return t["rotulo"]
+    raise ValueError(f"Termo '{termo}' não existe na variável '{var['nome']}'")
+
+def compilar(spec):
+    """Valida a especificação e gera (meta, arrays) prontos para TabelasFuzzy."""
+    nomes = tuple(v["nome"] for v in spec["entradas"])
+    if nomes != ENTRADAS:
+        raise ValueError(f"Entradas devem ser {list(ENTRADAS)} nesta ordem (recebido {list(nomes)})")
+    if not spec["regras"]:
+        raise ValueError("A especificação precisa de pelo menos uma regra")
+    variaveis = {v["nome"]: v for v in spec["entradas"]}
+    saida = spec["saida"]
+
+    arrays = {}
+    for v in spec["entradas"] + [saida]:
+        ini, fim, n = v["universo"]
+        # Os motores supõem pontos igualmente espaçados (dx = u[1] - u[0])
+        if n != int(n) or n < 2 or not fim > ini:
+            raise ValueError(f"Universo de '{v['nome']}' deve ser [início, fim > início, n >= 2 inteiro]")
+        univ = np.linspace(ini, fim, int(n))
+        arrays[f"univ_{v['nome']}"] = univ
+        mfs = []
+        for t in v["termos"]:
+            pts = t["trimf"]
+            if len(pts) != 3:
+                raise ValueError(f"trimf de '{v['nome']}.{t['nome']}' precisa de 3 pontos")
+            if not pts[0] <= pts[1] <= pts[2]:
+                raise ValueError(f"trimf de '{v['nome']}.{t['nome']}' precisa de a <= b <= c")
+            mfs.append(fuzz.trimf(univ, pts))
+        arrays[f"mf_{v['nome']}"] = np.array(mfs)
+
+    regras = []
+    for i, r in enumerate(spec["regras"]):
+        ants = [tuple(a) for a in r["se"]]
+        if not ants:
+            raise ValueError(f"Regra {i + 1}: sem antecedentes")
+        _rotulo(saida, r["entao"])
+        for v, t in ants:
+            if v not in variaveis:
+                raise ValueError(f"Regra {i + 1}: variável '{v}' não é entrada")
+            _rotulo(variaveis[v], t)
+        regras.append({
+            "desc": _descricao(variaveis, ants, r["entao"], saida),
+            "ants": ants,
+            "out": r["entao"],
+        })
+
+    # Singletons da saída: centróide (modo sugeno) e pico (modo media_picos)
+    univ_s = arrays[f"univ_{saida['nome']}"]
+    mf_s = arrays[f"mf_{saida['nome']}"]
+    arrays["centros_saida"] = np.sum(mf_s * univ_s, axis=1) / np.sum(mf_s, axis=1)
+    arrays["picos_saida"] = univ_s[np.argmax(mf_s, axis=1)]
+
+    meta = dict(spec)
+    meta["regras_debug"] = regras
+    return meta, arrays
+
+
+# --- CACHE ---
+def carregar_controlador(origem):
+    """
+    Retorna as TabelasFuzzy da especificação (caminho ou dicionário).
+    Mesma especificação (mesmo hash) = mesmo objeto, sem recompilar.
+    As tabelas ficam só em memória: compilar é mais rápido que ler um
+    arquivo; o que vai para o disco é o sistema skfuzzy (criar_sistema_skfuzzy).
+    """
+    spec = ler_spec(origem)
+    h = hash_spec(spec)
+    chave = f"{h}-v{VERSAO_COMPILADOR}"
+    if chave not in _compilados:
+        _compilados[chave] = TabelasFuzzy(*compilar(spec), h)
+    return _compilados[chave]
+
+def _arquivo_sistema(tab, pasta_cache):
+    return os.path.join(pasta_cache, f"{tab.hash}-v{VERSAO_COMPILADOR}-skfuzzy{fuzz.__version__}.pkl")
+
+def _salvar_sistema(arq, sistema):
+    tmp = arq + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(sistema, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, arq)
+
+def _ler_sistema(arq):
+    with open(arq, "rb") as f:
+        return pickle.load(f)
+
+
+# --- GERAÇÃO DO SISTEMA SKFUZZY E DO TEXTO DAS REGRAS ---
+def criar_sistema_skfuzzy(tab, pasta_cache=PASTA_CACHE):
+    """
+    (variaveis, regras, ControlSystem) das tabelas. Montar o sistema é a
+    etapa cara (~60 ms contra <1 ms das tabelas), então ele fica guardado
+    no objeto e em pasta_cache/<hash>-v<versão>-skfuzzy<versão>.pkl.
+    Arquivo ilegível é remontado e regravado; sem acesso ao disco (ex.:
+    checkout somente leitura), fica só em memória.
+    """
+    if tab.skfuzzy is not None:
+        return tab.skfuzzy
+
+    arq = _arquivo_sistema(tab, pasta_cache) if pasta_cache else None
+    if arq and os.path.exists(arq):
+        try:
+            tab.skfuzzy = _ler_sistema(arq)
+            return tab.skfuzzy
+        except Exception:
+            pass  # vazio, truncado ou corrompido: remonta e regrava
+    tab.skfuzzy = _montar_sistema(tab)
+    if arq:
+        try:
+            os.makedirs(pasta_cache, exist_ok=True)
+            _salvar_sistema(arq, tab.skfuzzy)
+        except OSError:
+            pass
+    return tab.skfuzzy
+
+def _montar_sistema(tab):
+    """Monta Antecedents/Consequent, ctrl.Rule e ControlSystem a partir das tabelas."""
+    variaveis = {}
+    for nome in tab.entradas:
+        variaveis[nome] = ctrl.Antecedent(tab.universos[nome], nome)
+    variaveis[tab.saida] = ctrl.Consequent(tab.universos[tab.saida], tab.saida)
+    for nome, var in variaveis.items():
+        for termo, mf in zip(tab.termos[nome], tab.mfs[nome]):
+            var[termo] = mf
+
+    regras = []
+    for reg in tab.regras:
+        antecedente = None
+        for v, t in reg["ants"]:
+            termo = variaveis[v][t]
+            antecedente = termo if antecedente is None else antecedente & termo
+        regras.append(ctrl.Rule(antecedente, variaveis[tab.saida][reg["out"]]))
+
+    return variaveis, regras, ctrl.ControlSystem(regras)
+
+def texto_regras(tab):
+    """Regras numeradas para exibição (janela MOSTRAR REGRAS)."""
+    linhas = []
+    for i, reg in enumerate(tab.regras, start=1):
+        partes = [f"{tab.variaveis[v]['rotulo']} é {tab.rotulo_termo(v, t)}"
+                  for v, t in reg["ants"]]
+        saida = tab.variaveis[tab.saida]
+        linhas.append(f"{i}) Se {' e '.join(partes)} → {saida['rotulo']} = "
+                      f"{tab.rotulo_termo(tab.saida, reg['out'])}")
+    return linhas
@@ -16,12 +16,15 @@ import os
 
 from main import (
     fuzzy_controller,
-    modelo_fisico,
-    criar_graficos_mf,
-    get_temp_externa,
-    get_carga_termica,
-    fuzzy_debug,
+    CacheControlador,
+    tabelas,
+    texto_regras,
 )
+from instrumentacao import Instrumentacao, perfilar
+from superficie import SuperficiesControle, ExploradorSuperficie
+from janelas import abrir, atualizar_abertas, InspetorMF, InspetorInferencia
+from simulacao import simular, ArmazenamentoBlocos, carregar_checkpoint, MINUTOS_DIA
+from alarmes import MotorAlarmes
 
 # ==========================================
 # CONFIGURAÇÃO MQTT (REMETENTE)
@@ -58,16 +61,41 @@ def publicar_mqtt(t, temp, crac, carga, erro):
     })
     client_mqtt.publish(f"{base}/control", payload)
 
-    if temp < 18 or temp > 26:
-        client_mqtt.publish(f"{base}/alert",
-            json.dumps({"msg": "TEMP CRITICA", "val": temp})
-        )
+# Última transição de alarme não enviada (broker offline); sai na reconexão
+alarme_pendente = None
+
+def publicar_alarme(evento=None):
+    """
+    Publica a transição de alarme (retain: quem conectar no meio de um
+    alarme recebe o estado atual). Offline, guarda só a mais recente.
+    """
+    global alarme_pendente
+    if evento is not None:
+        alarme_pendente = evento
+    if alarme_pendente is None or not client_mqtt.is_connected():
+        return
+    client_mqtt.publish("datacenter/fuzzy/alert", json.dumps(alarme_pendente), retain=True)
+    alarme_pendente = None
+
+def publicar_metricas():
+    if not client_mqtt.is_connected():
+        return
+
+    client_mqtt.publish("datacenter/fuzzy/metrics", json.dumps({
+        "etapas": instr.como_dict(),
+        "cache": cache_simulacao.estatisticas() if cache_simulacao else None,
+        "alarmes": motor_alarmes.estatisticas(),
+    }))
 
 # ==========================================
 # FUNÇÕES DE INTERFACE (MANUAL)
 # ==========================================
 manual_prev = 50.0
 
+# Cache da aba manual: os passos coincidem com a resolução dos sliders,
+# então a resposta é a mesma do controlador sem cache
+cache_fuzzy = CacheControlador()
+
 def resetar_valores():
     sld_erro.set(0)
     sld_de.set(0)
@@ -83,43 +111,37 @@ def calcular_manual():
         ext = sld_text.get()
         c = sld_qest.get()
 
-        res = fuzzy_controller(e, de, ext, c, manual_prev)
+        res = fuzzy_controller(e, de, ext, c, manual_prev, cache=cache_fuzzy)
         manual_prev = res
         var_res_manual.set(f"{res:.2f}%")
+        atualizar_inspetores()
 
     except Exception as e:
         messagebox.showerror("Erro", str(e))
 
 
-def mostrar_graficos_mf():
+def abrir_inspetor(cls, *args):
+    # Uma janela por tipo: reabre a existente e atualiza no lugar
     try:
-        e = sld_erro.get()
-        de = sld_de.get()
-        ext = sld_text.get()
-        c = sld_qest.get()
-
-        fig = criar_graficos_mf(e, de, ext, c, manual_prev)
-        fig.show()
+        abrir(cls, root, *args)
+        atualizar_inspetores()
 
     except Exception as x:
         messagebox.showerror("Erro", str(x))
 
 
+def atualizar_inspetores(_=None):
+    # Chamado pelos sliders: só altera os artistas das janelas abertas
+    atualizar_abertas(sld_erro.get(), sld_de.get(), sld_text.get(),
+                      sld_qest.get(), manual_prev)
+
+
+def mostrar_graficos_mf():
+    abrir_inspetor(InspetorMF)
+
+
 def mostrar_regras():
-    regras_texto = [
-        "1) Se erro é POS e de é POS → PCRAC = ALTA",
-        "2) Se erro é POS e de é ZERO → PCRAC = ALTA",
-        "3) Se erro é POS e de é NEG → PCRAC = MÉDIA",
-        "4) Se erro é ZERO e de é POS → PCRAC = ALTA",
-        "5) Se erro é ZERO e de é ZERO → PCRAC = MÉDIA",
-        "6) Se erro é ZERO e de é NEG → PCRAC = BAIXA",
-        "7) Se erro é NEG e de é POS → PCRAC = MÉDIA",
-        "8) Se erro é NEG e de é ZERO → PCRAC = BAIXA",
-        "9) Se erro é NEG e de é NEG → PCRAC = BAIXA",
-        "10) Se Temp Externa é ALTA → PCRAC = ALTA",
-        "11) Se Temp Externa é BAIXA → PCRAC = BAIXA",
-        "12) Se Carga Térmica é ALTA → PCRAC = ALTA",
-    ]
+    regras_texto = texto_regras(tabelas)
 
     win = tk.Toplevel()
     win.title("📜 Regras Fuzzy")
@@ -137,66 +159,13 @@ def mostrar_regras():
 
 
 def mostrar_inferencia():
-    try:
-        e = sld_erro.get()
-        de = sld_de.get()
-        ext = sld_text.get()
-        c = sld_qest.get()
-
-        dbg = fuzzy_debug(e, de, ext, c)
-
-        regras_dbg = dbg["regras"]
-        agregado = dbg["agregado"]
-        universo = dbg["universo"]
-        p_defuzz = dbg["p_defuzz"]
-
-        win = tk.Toplevel()
-        win.title("🔍 Processo de Inferência Fuzzy")
-        win.geometry("900x600")
-
-        # Título
-        frm_top = ttk.Frame(win)
-        frm_top.pack(fill="x", padx=10, pady=5)
-
-        lbl_info = ttk.Label(
-            frm_top,
-            text=f"Entradas: Erro={e:.2f}, dErro={de:.2f}, Text={ext:.2f}, Qest={c:.2f}",
-            font=("Arial", 11, "bold")
-        )
-        lbl_info.pack()
-
-        frm_main = ttk.Frame(win)
-        frm_main.pack(fill="both", expand=True)
-
-        # Lista de regras
-        frm_r = ttk.LabelFrame(frm_main, text="Regras Ativadas")
-        frm_r.pack(side="left", fill="both", expand=True, padx=5)
-
-        txt = tk.Text(frm_r, wrap="word", font=("Arial", 10))
-        txt.pack(fill="both", expand=True)
-
-        ordenadas = sorted(regras_dbg, key=lambda r: r["alpha"], reverse=True)
-        for r in ordenadas:
-            if r["alpha"] > 0:
-                txt.insert("end", f"[{r['alpha']:.3f}] {r['descricao']}\n\n")
-        txt.config(state="disabled")
-
-        # Gráfico
-        frm_g = ttk.LabelFrame(frm_main, text="Saída Agregada + Defuzzificação")
-        frm_g.pack(side="left", fill="both", expand=True, padx=5)
+    abrir_inspetor(InspetorInferencia)
 
-        fig = plt.Figure(figsize=(5, 3), dpi=100)
-        ax = fig.add_subplot(111)
-        ax.plot(universo, agregado)
-        ax.axvline(p_defuzz, color="red", linestyle="--")
-        ax.set_title("Agregação Fuzzy da Saída")
 
-        canvas_local = FigureCanvasTkAgg(fig, master=frm_g)
-        canvas_local.get_tk_widget().pack(fill="both", expand=True)
-        canvas_local.draw()
+superficies = SuperficiesControle()
 
-    except Exception as e:
-        messagebox.showerror("Erro", str(e))
+def mostrar_superficie():
+    abrir_inspetor(ExploradorSuperficie, superficies)
 
 
 def abrir_monitor_externo():
@@ -210,19 +179,39 @@ def abrir_monitor_externo():
 # SIMULAÇÃO 24h
 # ==========================================
 
+# Alarmes com histerese, duração mínima e limite de taxa (ver alarmes.py)
+motor_alarmes = MotorAlarmes()
+
+# Cache na simulação é opcional (FUZZY_CACHE_SIM=1): ele infere no ponto
+# quantizado e o dE típico da simulação é menor que o passo de 0.1,
+# então a trajetória muda em relação ao controlador sem cache
+CACHE_SIMULACAO = os.environ.get("FUZZY_CACHE_SIM") == "1"
+# Um cache por simulação, separado do da aba manual: o LRU não tem lock e
+# as duas threads não podem dividir a mesma instância
+cache_simulacao = None
+
+# Contadores por etapa (desligar com FUZZY_INSTR=0)
+instr = Instrumentacao(ativo=os.environ.get("FUZZY_INSTR", "1") != "0")
+# Caminho do .prof para rodar a simulação sob cProfile (ex.: FUZZY_PERFIL=sim.prof)
+PERFIL_SIMULACAO = os.environ.get("FUZZY_PERFIL")
+
+# Resultados em blocos + checkpoint (permite retomar simulações longas)
+PASTA_RESULTADOS = os.environ.get("FUZZY_RESULTADOS", "resultados")
+# Minutos mostrados no gráfico (a simulação inteira fica nos blocos em disco)
+JANELA_GRAFICO = 1440
+
 simulando = False
-dados_x = []
-dados_y1 = []
-dados_y2 = []
-dados_ext = []
+armazenamento = ArmazenamentoBlocos()
 
-def thread_simulacao():
-    global simulando
+def thread_simulacao(retomar=False):
+    global simulando, armazenamento, cache_simulacao
     simulando = True
     
     # Trava os controles durante a simulação
     btn_sim_start.config(state="disabled")
+    btn_sim_resume.config(state="disabled")
     cmb_setpoint.config(state="disabled")
+    cmb_horizonte.config(state="disabled")
     scale_e_init.config(state="disabled") 
 
     # 1. Pega o Setpoint
@@ -237,63 +226,79 @@ def thread_simulacao():
     except:
         erro_inicial = 0.0
 
-    dados_x.clear()
-    dados_y1.clear()
-    dados_y2.clear()
-    dados_ext.clear()
-
-    ax1.clear()
-    ax2.clear()
-
-    # --- DEFINIÇÃO DA TEMPERATURA INICIAL ---
-    # Se Erro = T - Setpoint, então T = Setpoint + Erro
-    T = sp + erro_inicial
-    
-    Prev = 50.0
-    e_ant = 0
+    # 3. Pega o Horizonte (minutos)
+    try:
+        horizonte = max(1, int(float(cmb_horizonte.get())))
+    except:
+        horizonte = MINUTOS_DIA
 
-    for t in range(1440):
-        if not simulando:
-            break
+    # 4. Retomada: setpoint e horizonte vêm do checkpoint
+    if retomar:
+        ckpt = carregar_checkpoint(PASTA_RESULTADOS)
+        if ckpt is None:
+            retomar = False
+            print("Nenhum checkpoint encontrado, iniciando nova simulação.")
+        else:
+            sp = ckpt["sp"]
+            horizonte = ckpt["horizonte"]
 
-        ext = get_temp_externa(t)
-        qest = get_carga_termica(t)
+    armazenamento = ArmazenamentoBlocos(PASTA_RESULTADOS)
+    cache_simulacao = CacheControlador() if CACHE_SIMULACAO else None
 
-        # CÁLCULO DO ERRO
-        erro = T - sp
-        dE = erro - e_ant
+    ax1.clear()
+    ax2.clear()
+    instr.limpar()
+    motor_alarmes.limpar()
+    # Substitui o alerta retido da simulação anterior
+    publicar_alarme({"sala": 0, "minuto": 0, "nivel": "NORMAL",
+                     "anterior": None, "msg": "NORMAL", "val": None})
+
+    sim = simular(sp, erro_inicial, horizonte, pasta=PASTA_RESULTADOS,
+                  armazenamento=armazenamento, retomar=retomar,
+                  cache=cache_simulacao, instr=instr)
+
+    if PERFIL_SIMULACAO:
+        perfilar(loop_simulacao, sim, sp, horizonte, arquivo=PERFIL_SIMULACAO)
+    else:
+        loop_simulacao(sim, sp, horizonte)
 
-        # Controlador Fuzzy
-        PCRAC = fuzzy_controller(
-            max(-10, min(10, erro)),
-            max(-2, min(2, dE)),
-            max(10, min(35, ext)),
-            max(0, min(100, qest)),
-            Prev
-        )
+    simulando = False
+    print(instr.resumo())
+    publicar_metricas()
+    # Destrava os controles
+    root.after(0, lambda: btn_sim_start.config(state="normal"))
+    root.after(0, lambda: btn_sim_resume.config(state="normal"))
+    root.after(0, lambda: cmb_setpoint.config(state="readonly"))
+    root.after(0, lambda: cmb_horizonte.config(state="normal"))
+    root.after(0, lambda: scale_e_init.config(state="normal"))
 
-        T_next = modelo_fisico(T, PCRAC, qest, ext)
 
-        publicar_mqtt(t, T, PCRAC, qest, erro)
+def loop_simulacao(sim, sp, horizonte):
+    # Redesenha ~96 vezes por horizonte (a cada 15 min num dia)
+    passo_grafico = max(15, horizonte // 96)
 
-        dados_x.append(t/60)
-        dados_y1.append(T)
-        dados_y2.append(PCRAC)
-        dados_ext.append(ext)
+    try:
+        for t, T, PCRAC, ext, qest, erro in sim:
+            if not simulando:
+                break
 
-        if t % 15 == 0:
-            root.after(0, atualizar_grafico_sim, T, PCRAC, ext, sp)
-            time.sleep(0.02)
+            t0 = instr.agora()
+            publicar_mqtt(t, T, PCRAC, qest, erro)
+            instr.registrar("mqtt", t0)
 
-        Prev = PCRAC
-        e_ant = erro
-        T = T_next
+            # Alarme avaliado todo minuto, com ou sem broker: duração e
+            # histerese acompanham a planta; só a publicação depende da conexão
+            t0 = instr.agora()
+            eventos = motor_alarmes.avaliar(t, T=T)
+            publicar_alarme(eventos[-1] if eventos else None)
+            instr.registrar("alarme", t0)
 
-    simulando = False
-    # Destrava os controles
-    root.after(0, lambda: btn_sim_start.config(state="normal"))
-    root.after(0, lambda: cmb_setpoint.config(state="readonly"))
-    root.after(0, lambda: scale_e_init.config(state="normal"))
+            if t % passo_grafico == 0:
+                root.after(0, atualizar_grafico_sim, T, PCRAC, ext, sp)
+                time.sleep(0.02)
+    finally:
+        # Fecha o gerador: grava o bloco parcial e o checkpoint
+        sim.close()
 
 
 def parar_simulacao():
@@ -302,12 +307,16 @@ def parar_simulacao():
 
 
 def atualizar_grafico_sim(temp, crac, ext, sp):
+    t0 = instr.agora()
     ax1.clear()
     ax2.clear()
 
+    dados = armazenamento.ultimos(JANELA_GRAFICO)
+    horas = dados[:, 0] / 60
+
     # Temperaturas
-    ax1.plot(dados_x, dados_y1, 'r-', label="Temp Interna")
-    ax1.plot(dados_x, dados_ext, 'g-', label="Temp Externa")
+    ax1.plot(horas, dados[:, 1], 'r-', label="Temp Interna")
+    ax1.plot(horas, dados[:, 3], 'g-', label="Temp Externa")
     
     # Linha do Setpoint
     ax1.axhline(sp, color='black', linestyle='--', alpha=0.5, label=f"Setpoint ({sp}°C)")
@@ -317,15 +326,16 @@ def atualizar_grafico_sim(temp, crac, ext, sp):
     ax1.legend(loc="upper left")
 
     # CRAC
-    ax2.plot(dados_x, dados_y2, 'b-', alpha=0.4)
+    ax2.plot(horas, dados[:, 2], 'b-', alpha=0.4)
     ax2.set_ylabel("CRAC (%)", color="blue")
     ax2.set_ylim(0, 100)
 
     ax1.set_title(
-        f"Simulação 24h (Target: {sp}°C | Erro Atual: {temp-sp:.1f})"
+        f"Simulação (Dia {int(horas[-1] // 24) + 1} | Target: {sp}°C | Erro Atual: {temp-sp:.1f})"
     )
 
     canvas.draw()
+    instr.registrar("grafico", t0)
 
 
 # ==========================================
@@ -348,19 +358,23 @@ frm_inputs = ttk.LabelFrame(tab_manual, text="Entradas do Controlador")
 frm_inputs.pack(fill="x", padx=10, pady=10)
 
 sld_erro = tk.Scale(frm_inputs, from_=-10, to=10, orient="horizontal",
-                    label="Erro (e)", length=400, resolution=0.1)
+                    label="Erro (e)", length=400, resolution=0.1,
+                    command=atualizar_inspetores)
 sld_erro.pack(pady=5)
 
 sld_de = tk.Scale(frm_inputs, from_=-2, to=2, orient="horizontal",
-                  label="Delta Erro (de)", length=400, resolution=0.1)
+                  label="Delta Erro (de)", length=400, resolution=0.1,
+                  command=atualizar_inspetores)
 sld_de.pack(pady=5)
 
 sld_text = tk.Scale(frm_inputs, from_=10, to=35, orient="horizontal",
-                    label="Temp Externa", length=400, resolution=0.5)
+                    label="Temp Externa", length=400, resolution=0.5,
+                    command=atualizar_inspetores)
 sld_text.pack(pady=5)
 
 sld_qest = tk.Scale(frm_inputs, from_=0, to=100, orient="horizontal",
-                    label="Carga Térmica (%)", length=400, resolution=1)
+                    label="Carga Térmica (%)", length=400, resolution=1,
+                    command=atualizar_inspetores)
 sld_qest.pack(pady=5)
 
 frm_actions = ttk.Frame(tab_manual)
@@ -378,6 +392,9 @@ ttk.Button(frm_actions, text="📜 MOSTRAR REGRAS",
 ttk.Button(frm_actions, text="🔍 VER INFERÊNCIA",
            command=mostrar_inferencia).pack(side="left", padx=10)
 
+ttk.Button(frm_actions, text="🗺️ SUPERFÍCIE",
+           command=mostrar_superficie).pack(side="left", padx=10)
+
 ttk.Button(frm_actions, text="🔄 RESETAR",
            command=resetar_valores).pack(side="left", padx=10)
 
@@ -408,6 +425,12 @@ cmb_setpoint = ttk.Combobox(frm_ctrl, values=["16", "22", "26", "32"], width=5,
 cmb_setpoint.current(1) # Padrão 22
 cmb_setpoint.pack(side="left", padx=5)
 
+# --- HORIZONTE ---
+ttk.Label(frm_ctrl, text="Horizonte (min):", font=("Arial", 10, "bold")).pack(side="left", padx=5)
+cmb_horizonte = ttk.Combobox(frm_ctrl, values=["1440", "10080", "43200", "525600"], width=7)
+cmb_horizonte.current(0) # Padrão 24h
+cmb_horizonte.pack(side="left", padx=5)
+
 # --- ERRO INICIAL ---
 ttk.Label(frm_ctrl, text="Erro Inicial:", font=("Arial", 10, "bold")).pack(side="left", padx=5)
 scale_e_init = tk.Scale(frm_ctrl, from_=-10, to=10, orient="horizontal", length=150, resolution=0.5)
@@ -422,6 +445,12 @@ btn_sim_start = ttk.Button(frm_ctrl,
                                target=thread_simulacao, daemon=True).start())
 btn_sim_start.pack(side="left", padx=10, pady=10)
 
+btn_sim_resume = ttk.Button(frm_ctrl,
+                            text="⏯ RETOMAR",
+                            command=lambda: threading.Thread(
+                                target=thread_simulacao, args=(True,), daemon=True).start())
+btn_sim_resume.pack(side="left", padx=10)
+
 ttk.Button(frm_ctrl, text="⏹ PARAR",
            command=parar_simulacao).pack(side="left", padx=10)
 
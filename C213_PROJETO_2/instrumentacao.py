@@ -0,0 +1,128 @@
+# instrumentacao.py – CONTADORES E PERFIL DO LOOP DE SIMULAÇÃO
+import time
+import cProfile
+import pstats
+import io
+
+# Limites superiores (em µs) dos baldes do histograma; o último é "acima de"
+BALDES_US = (10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+def _zero():
+    return 0
+
+def _nada(etapa, t0):
+    pass
+
+
+class Instrumentacao:
+    """
+    Contadores por etapa (cenario, fuzzy, modelo, mqtt, alarme, grafico...) com
+    histograma de latência, medidos com relógio monotônico (perf_counter_ns).
+
+    Uso no hot path:
+        t0 = instr.agora()
+        ...
+        instr.registrar("fuzzy", t0)
+
+    Com ativo=False, agora/registrar viram funções vazias (sem leitura
+    de relógio nem acesso a dicionário).
+
+    A etapa "grafico" é registrada pela thread do Tk enquanto a simulação
+    lê os contadores: como_dict() trabalha sobre uma cópia das etapas.
+    """
+    def __init__(self, ativo=True):
+        self.etapas = {}
+        self.ativar(ativo)
+
+    def ativar(self, ativo):
+        self.ativo = ativo
+        if ativo:
+            self.agora = time.perf_counter_ns
+            self.registrar = self._registrar
+        else:
+            self.agora = _zero
+            self.registrar = _nada
+
+    def limpar(self):
+        self.etapas.clear()
+
+    def _registrar(self, etapa, t0):
+        dt = time.perf_counter_ns() - t0
+        est = self.etapas.get(etapa)
+        if est is None:
+            est = self.etapas[etapa] = {
+                "n": 0, "total_ns": 0, "max_ns": 0,
+                "hist": [0] * (len(BALDES_US) + 1),
+            }
+        est["n"] += 1
+        est["total_ns"] += dt
+        if dt > est["max_ns"]:
+            est["max_ns"] = dt
+        us = dt / 1000
+        i = 0
+        while i < len(BALDES_US) and us > BALDES_US[i]:
+            i += 1
+        est["hist"][i] += 1
+
+    def _percentil(self, hist, n, q, maximo):
+        # Aproximação pelo limite superior do balde; o último balde não tem
+        # limite, então usa o máximo medido (inf não é JSON válido no MQTT)
+        alvo = q * n
+        acum = 0
+        for i, c in enumerate(hist):
+            acum += c
+            if acum >= alvo:
+                return BALDES_US[i] if i < len(BALDES_US) else maximo
+        return maximo
+
+    def como_dict(self):
+        saida = {}
+        for etapa, est in list(self.etapas.items()):
+            hist = list(est["hist"])
+            n = sum(hist)
+            maximo = round(est["max_ns"] / 1000, 2)
+            saida[etapa] = {
+                "n": n,
+                "total_ms": round(est["total_ns"] / 1e6, 3),
+                "media_us": round(est["total_ns"] / n / 1000, 2) if n else 0.0,
+                "max_us": maximo,
+                "p50_us": self._percentil(hist, n, 0.5, maximo),
+                "p99_us": self._percentil(hist, n, 0.99, maximo),
+                "hist": hist,
+            }
+        return saida
+
+    def resumo(self):
+        """Tabela de texto com uma linha por etapa (ordenada por tempo total)."""
+        dados = self.como_dict()
+        total = sum(d["total_ms"] for d in dados.values()) or 1.0
+        linhas = [
+            f"{'Etapa':<10} {'Chamadas':>9} {'Total(ms)':>10} {'%':>6} "
+            f"{'Média(µs)':>10} {'p50(µs)':>8} {'p99(µs)':>8} {'Máx(µs)':>9}"
+        ]
+        for etapa, d in sorted(dados.items(), key=lambda kv: -kv[1]["total_ms"]):
+            linhas.append(
+                f"{etapa:<10} {d['n']:>9} {d['total_ms']:>10.1f} "
+                f"{100 * d['total_ms'] / total:>6.1f} {d['media_us']:>10.1f} "
+                f"{d['p50_us']:>8} {d['p99_us']:>8} {d['max_us']:>9.1f}"
+            )
+        return "\n".join(linhas)
+
+
+def perfilar(func, *args, arquivo=None, top=15, **kwargs):
+    """
+    Executa func(*args, **kwargs) sob cProfile e imprime as funções mais
+    custosas (tempo acumulado). Se arquivo for informado, salva o .prof
+    para análise externa (snakeviz, pstats...).
+    """
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        perfil.disable()
+        if arquivo:
+            perfil.dump_stats(arquivo)
+        s = io.StringIO()
+        pstats.Stats(perfil, stream=s).sort_stats("cumulative").print_stats(top)
+        print(s.getvalue())
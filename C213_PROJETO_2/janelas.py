@@ -0,0 +1,197 @@
+# janelas.py – JANELAS DE INSPEÇÃO PERSISTENTES (UMA POR TIPO)
+import tkinter as tk
+from tkinter import ttk
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from main import criar_graficos_mf, fuzzy_debug
+
+# Janelas abertas, indexadas pela classe
+_abertas = {}
+
+
+def abrir(cls, master, *args):
+    """
+    Retorna a janela já aberta do tipo cls (trazendo-a para frente)
+    ou cria uma nova. Nunca existem duas janelas do mesmo tipo.
+    """
+    jan = _abertas.get(cls)
+    if jan is not None and jan.existe():
+        jan.win.deiconify()
+        jan.win.lift()
+        return jan
+    jan = cls(master, *args)
+    _abertas[cls] = jan
+    return jan
+
+
+def atualizar_abertas(e, de, Text, Qest, Prev):
+    """Repassa as entradas atuais para todas as janelas abertas."""
+    for jan in list(_abertas.values()):
+        if jan.existe():
+            jan.atualizar(e, de, Text, Qest, Prev)
+
+
+def fechar_todas():
+    for jan in list(_abertas.values()):
+        jan.fechar()
+
+
+class JanelaInspetor:
+    """
+    Base: um Toplevel com uma Figure (fora do pyplot) e um canvas Tk,
+    criados uma única vez. As subclasses montam os artistas em montar()
+    e só alteram os dados deles em atualizar(). fechar() destrói a
+    janela e limpa a figura, liberando os artistas.
+    """
+    titulo = ""
+    geometria = "900x600"
+
+    def __init__(self, master, *args):
+        self.win = tk.Toplevel(master)
+        self.win.title(self.titulo)
+        self.win.geometry(self.geometria)
+        self.win.protocol("WM_DELETE_WINDOW", self.fechar)
+        self.fig = None
+        self.canvas = None
+        self.montar(*args)
+
+    def montar(self, *args):
+        raise NotImplementedError
+
+    def atualizar(self, e, de, Text, Qest, Prev):
+        raise NotImplementedError
+
+    def criar_canvas(self, master):
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def existe(self):
+        return self.win is not None and bool(self.win.winfo_exists())
+
+    def fechar(self):
+        if self.win is None:
+            return
+        if self.canvas is not None:
+            self.canvas.get_tk_widget().destroy()
+            self.canvas = None
+        if self.fig is not None:
+            self.fig.clear()
+            self.fig = None
+        self.win.destroy()
+        self.win = None
+        if _abertas.get(type(self)) is self:
+            del _abertas[type(self)]
+
+
+class InspetorMF(JanelaInspetor):
+    titulo = "📈 Funções de Pertinência"
+    geometria = "700x900"
+
+    def montar(self):
+        self.fig = plt.Figure(figsize=(8, 14), dpi=100)
+        criar_graficos_mf(0, 0, 25, 40, 50, fig=self.fig)
+        # A última linha de cada eixo é o cursor (axvline) da entrada atual
+        self.cursores = [ax.lines[-1] for ax in self.fig.axes]
+        self.criar_canvas(self.win)
+
+    def atualizar(self, e, de, Text, Qest, Prev):
+        for cursor, v in zip(self.cursores, (e, de, Text, Qest, Prev)):
+            cursor.set_xdata([v, v])
+        self.canvas.draw_idle()
+
+
+class InspetorInferencia(JanelaInspetor):
+    titulo = "🔍 Processo de Inferência Fuzzy"
+    geometria = "900x600"
+
+    def montar(self):
+        # Título
+        frm_top = ttk.Frame(self.win)
+        frm_top.pack(fill="x", padx=10, pady=5)
+
+        self.lbl_info = ttk.Label(frm_top, font=("Arial", 11, "bold"))
+        self.lbl_info.pack()
+
+        frm_main = ttk.Frame(self.win)
+        frm_main.pack(fill="both", expand=True)
+
+        # Lista de regras
+        frm_r = ttk.LabelFrame(frm_main, text="Regras Ativadas")
+        frm_r.pack(side="left", fill="both", expand=True, padx=5)
+
+        self.txt = tk.Text(frm_r, wrap="word", font=("Arial", 10))
+        self.txt.pack(fill="both", expand=True)
+
+        # Gráfico
+        frm_g = ttk.LabelFrame(frm_main, text="Saída Agregada + Defuzzificação")
+        frm_g.pack(side="left", fill="both", expand=True, padx=5)
+
+        self.fig = plt.Figure(figsize=(5, 3), dpi=100)
+        ax = self.fig.add_subplot(111)
+        dbg = fuzzy_debug(0, 0, 25, 40)
+        self.linha_agregado, = ax.plot(dbg["universo"], dbg["agregado"])
+        self.linha_defuzz = ax.axvline(dbg["p_defuzz"], color="red", linestyle="--")
+        ax.set_ylim(0, 1.05)
+        ax.set_title("Agregação Fuzzy da Saída")
+        self.criar_canvas(frm_g)
+
+    def atualizar(self, e, de, Text, Qest, Prev):
+        dbg = fuzzy_debug(e, de, Text, Qest)
+
+        self.lbl_info.config(
+            text=f"Entradas: Erro={e:.2f}, dErro={de:.2f}, Text={Text:.2f}, Qest={Qest:.2f}"
+        )
+
+        self.txt.config(state="normal")
+        self.txt.delete("1.0", "end")
+        ordenadas = sorted(dbg["regras"], key=lambda r: r["alpha"], reverse=True)
+        for r in ordenadas:
+            if r["alpha"] > 0:
+                self.txt.insert("end", f"[{r['alpha']:.3f}] {r['descricao']}\n\n")
+        self.txt.config(state="disabled")
+
+        self.linha_agregado.set_ydata(dbg["agregado"])
+        self.linha_defuzz.set_xdata([dbg["p_defuzz"], dbg["p_defuzz"]])
+        self.canvas.draw_idle()
+
+
+# --- TESTE DE RESISTÊNCIA (SOAK) ---
+# python janelas.py [ciclos]  -> abre/atualiza/fecha as janelas repetidamente
+# e imprime a memória alocada (tracemalloc) e o nº de figuras do pyplot.
+if __name__ == "__main__":
+    import sys
+    import gc
+    import random
+    import tracemalloc
+
+    ciclos = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    root = tk.Tk()
+    root.withdraw()
+
+    tracemalloc.start()
+    base = None
+    for i in range(ciclos):
+        for cls in (InspetorMF, InspetorInferencia):
+            jan = abrir(cls, root)
+            for _ in range(3):
+                jan.atualizar(random.uniform(-10, 10), random.uniform(-2, 2),
+                              random.uniform(10, 35), random.uniform(0, 100),
+                              random.uniform(0, 100))
+            jan.canvas.draw()
+        root.update()
+        if i % 2 == 1:
+            fechar_todas()
+            root.update()
+
+        if i % 100 == 99:
+            gc.collect()
+            atual = tracemalloc.get_traced_memory()[0] / 1e6
+            if base is None:
+                base = atual
+            print(f"ciclo {i + 1:>6}: {atual:8.2f} MB (Δ {atual - base:+.2f} MB), "
+                  f"figuras pyplot: {len(plt.get_fignums())}")
+
+    fechar_todas()
+    root.destroy()
@@ -4,189 +4,147 @@ import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 import matplotlib.pyplot as plt
 import random
+import os
+from collections import OrderedDict
+
+from especificacao import ENTRADAS, carregar_controlador, criar_sistema_skfuzzy, texto_regras
 
 # --- CONFIGURAÇÃO FUZZY ---
-erro_univ = np.linspace(-10, 10, 100)
-de_univ = np.linspace(-2, 2, 100)
-text_univ = np.linspace(10, 35, 100)
-qest_univ = np.linspace(0, 100, 100)
-pcrac_univ = np.linspace(0, 100, 100)
-
-erro_var = ctrl.Antecedent(erro_univ, 'erro')
-de_var = ctrl.Antecedent(de_univ, 'de')
-text_var = ctrl.Antecedent(text_univ, 'text')
-qest_var = ctrl.Antecedent(qest_univ, 'qest')
-pcrac_var = ctrl.Consequent(pcrac_univ, 'pcrac')
-
-# MFs (Funções de Pertinência)
-erro_var['neg'] = fuzz.trimf(erro_univ, [-10, -10, 0])
-erro_var['zero'] = fuzz.trimf(erro_univ, [-1, 0, 1])
-erro_var['pos'] = fuzz.trimf(erro_univ, [0, 16, 16])
-
-de_var['neg'] = fuzz.trimf(de_univ, [-2, -2, 0])
-de_var['zero'] = fuzz.trimf(de_univ, [-0.5, 0, 0.5])
-de_var['pos'] = fuzz.trimf(de_univ, [0, 2, 2])
-
-text_var['baixa'] = fuzz.trimf(text_univ, [10, 10, 20])
-text_var['media'] = fuzz.trimf(text_univ, [15, 22, 30])
-text_var['alta'] = fuzz.trimf(text_univ, [25, 35, 35])
-
-qest_var['baixa'] = fuzz.trimf(qest_univ, [0, 0, 40])
-qest_var['media'] = fuzz.trimf(qest_univ, [20, 50, 80])
-qest_var['alta'] = fuzz.trimf(qest_univ, [60, 100, 100])
-
-pcrac_var['baixa'] = fuzz.trimf(pcrac_univ, [0, 0, 40])
-pcrac_var['media'] = fuzz.trimf(pcrac_univ, [20, 50, 80])
-pcrac_var['alta'] = fuzz.trimf(pcrac_univ, [60, 100, 100])
+# Variáveis, universos, MFs e regras vêm de controlador.json (ver especificacao.py)
+ESPEC_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "controlador.json")
+tabelas = carregar_controlador(ESPEC_PADRAO)
+
+erro_univ = tabelas.universos['erro']
+de_univ = tabelas.universos['de']
+text_univ = tabelas.universos['text']
+qest_univ = tabelas.universos['qest']
+pcrac_univ = tabelas.universos['pcrac']
 
 # Regras (Mamdani via skfuzzy)
-regras = [
-    ctrl.Rule(erro_var['pos'] & de_var['pos'], pcrac_var['alta']),
-    ctrl.Rule(erro_var['pos'] & de_var['zero'], pcrac_var['alta']),
-    ctrl.Rule(erro_var['pos'] & de_var['neg'], pcrac_var['media']),
-    ctrl.Rule(erro_var['zero'] & de_var['pos'], pcrac_var['alta']),
-    ctrl.Rule(erro_var['zero'] & de_var['zero'], pcrac_var['media']),
-    ctrl.Rule(erro_var['zero'] & de_var['neg'], pcrac_var['baixa']),
-    ctrl.Rule(erro_var['neg'] & de_var['pos'], pcrac_var['media']),
-    ctrl.Rule(erro_var['neg'] & de_var['zero'], pcrac_var['baixa']),
-    ctrl.Rule(erro_var['neg'] & de_var['neg'], pcrac_var['baixa']),
-    ctrl.Rule(text_var['alta'], pcrac_var['alta']),
-    ctrl.Rule(text_var['baixa'], pcrac_var['baixa']),
-    ctrl.Rule(qest_var['alta'], pcrac_var['alta']),
-]
-
-sistema = ctrl.ControlSystem(regras)
+variaveis, regras, sistema = criar_sistema_skfuzzy(tabelas)
+erro_var = variaveis['erro']
+de_var = variaveis['de']
+text_var = variaveis['text']
+qest_var = variaveis['qest']
+pcrac_var = variaveis['pcrac']
+
 simulador = ctrl.ControlSystemSimulation(sistema)
 
 # --- FUNÇÃO CONTROLADOR (USADA NA SIMULAÇÃO) ---
-def fuzzy_controller(e, de, Text, Qest, Prev):
+def fuzzy_bruto(e, de, Text, Qest, modo=None):
+    """
+    Inferência Mamdani pura (sem suavização).
+    Retorna None quando nenhuma regra dispara e o skfuzzy não defuzzifica.
+    Com modo (ver MODOS_INFERENCIA), usa o motor vetorizado fuzzy_lote.
+    """
+    if modo is not None:
+        raw = float(fuzzy_lote(e, de, Text, Qest, modo))
+        return None if np.isnan(raw) else raw
     simulador.input['erro'] = e
     simulador.input['de'] = de
     simulador.input['text'] = Text
     simulador.input['qest'] = Qest
     try:
         simulador.compute()
-        raw = float(simulador.output['pcrac'])
+        return float(simulador.output['pcrac'])
     except:
+        return None
+
+def fuzzy_controller(e, de, Text, Qest, Prev, cache=None, modo=None):
+    if cache is not None:
+        # O cache guarda respostas de um único modo (definido na criação)
+        if modo != cache.modo:
+            raise ValueError(f"Cache criado para modo={cache.modo!r}, chamada com modo={modo!r}")
+        raw = cache.obter(e, de, Text, Qest)
+    else:
+        raw = fuzzy_bruto(e, de, Text, Qest, modo)
+    if raw is None:
         raw = Prev
     return 0.7 * Prev + 0.3 * raw
 
+# --- CACHE DO CONTROLADOR (MEMOIZAÇÃO LRU) ---
+# Passos padrão = resolução dos sliders da aba manual (erro, de, text, qest)
+PASSOS_PADRAO = (0.1, 0.1, 0.5, 1.0)
+
+class CacheControlador:
+    """
+    Memoização LRU limitada da inferência bruta.
+    As entradas são quantizadas pelos passos informados e a inferência é
+    feita no ponto quantizado, então a mesma chave sempre gera o mesmo valor.
+    A suavização 0.7/0.3 continua fora do cache (em fuzzy_controller).
+    """
+    def __init__(self, tamanho=4096, passos=PASSOS_PADRAO, modo=None):
+        self.tamanho = tamanho
+        self.passos = tuple(float(p) for p in passos)
+        self.modo = modo
+        self._dados = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def chave(self, e, de, Text, Qest):
+        return tuple(int(round(v / p)) for v, p in zip((e, de, Text, Qest), self.passos))
+
+    def obter(self, e, de, Text, Qest):
+        k = self.chave(e, de, Text, Qest)
+        try:
+            raw = self._dados[k]
+        except KeyError:
+            self.misses += 1
+            raw = fuzzy_bruto(*(i * p for i, p in zip(k, self.passos)), modo=self.modo)
+            self._dados[k] = raw
+            if len(self._dados) > self.tamanho:
+                self._dados.popitem(last=False)
+                self.evictions += 1
+            return raw
+        self.hits += 1
+        self._dados.move_to_end(k)
+        return raw
+
+    def limpar(self):
+        self._dados.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def estatisticas(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "tamanho": len(self._dados),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
 # --- MODELO FÍSICO ---
 def modelo_fisico(T_atual, PCRAC, Qest, Text):
     return 0.9*T_atual - 0.08*PCRAC + 0.05*Qest + 0.02*Text + 3.5
 
 # --- GRÁFICOS DAS FUNÇÕES DE PERTINÊNCIA ---
-def criar_graficos_mf(e, de, ext, c, p):
-    fig, axes = plt.subplots(5, 1, figsize=(8, 14))
+def criar_graficos_mf(e, de, ext, c, p, fig=None):
+    # Com fig informada, desenha nela (sem criar figura nova no pyplot)
+    if fig is None:
+        fig, axes = plt.subplots(5, 1, figsize=(8, 14))
+    else:
+        axes = fig.subplots(5, 1)
     fig.suptitle("Funções de Pertinência - Controlador Fuzzy", fontsize=14)
 
-    # 1. Erro
-    axes[0].plot(erro_univ, erro_var['neg'].mf, label="Negativo")
-    axes[0].plot(erro_univ, erro_var['zero'].mf, label="Zero")
-    axes[0].plot(erro_univ, erro_var['pos'].mf, label="Positivo")
-    axes[0].axvline(e, color='red', linestyle='--', label="Entrada Atual")
-    axes[0].set_title("Erro (e)")
-    axes[0].legend()
-
-    # 2. Delta Erro
-    axes[1].plot(de_univ, de_var['neg'].mf, label="Negativo")
-    axes[1].plot(de_univ, de_var['zero'].mf, label="Zero")
-    axes[1].plot(de_univ, de_var['pos'].mf, label="Positivo")
-    axes[1].axvline(de, color='red', linestyle='--')
-    axes[1].set_title("Delta do Erro (de)")
-    axes[1].legend()
-
-    # 3. Temperatura Externa
-    axes[2].plot(text_univ, text_var['baixa'].mf, label="Baixa")
-    axes[2].plot(text_univ, text_var['media'].mf, label="Média")
-    axes[2].plot(text_univ, text_var['alta'].mf, label="Alta")
-    axes[2].axvline(ext, color='red', linestyle='--')
-    axes[2].set_title("Temperatura Externa")
-    axes[2].legend()
-
-    # 4. Carga Térmica
-    axes[3].plot(qest_univ, qest_var['baixa'].mf, label="Baixa")
-    axes[3].plot(qest_univ, qest_var['media'].mf, label="Média")
-    axes[3].plot(qest_univ, qest_var['alta'].mf, label="Alta")
-    axes[3].axvline(c, color='red', linestyle='--')
-    axes[3].set_title("Carga Térmica (%)")
-    axes[3].legend()
-
-    # 5. Saída PCRAC
-    axes[4].plot(pcrac_univ, pcrac_var['baixa'].mf, label="Baixa")
-    axes[4].plot(pcrac_univ, pcrac_var['media'].mf, label="Média")
-    axes[4].plot(pcrac_univ, pcrac_var['alta'].mf, label="Alta")
-    axes[4].axvline(p, color='red', linestyle='--')
-    axes[4].set_title("Ação do CRAC (%)")
-    axes[4].legend()
-
-    plt.tight_layout()
+    # Uma linha por variável (entradas e saída), na ordem da especificação
+    nomes = tabelas.entradas + [tabelas.saida]
+    for i, (ax, nome, valor) in enumerate(zip(axes, nomes, (e, de, ext, c, p))):
+        var = tabelas.variaveis[nome]
+        for termo, mf in zip(var["termos"], tabelas.mfs[nome]):
+            ax.plot(tabelas.universos[nome], mf, label=termo["legenda"])
+        ax.axvline(valor, color='red', linestyle='--',
+                   label="Entrada Atual" if i == 0 else None)
+        ax.set_title(var["titulo"])
+        ax.legend()
+
+    fig.tight_layout()
     return fig
 
 # --- DEBUG / VISUALIZAÇÃO DO PROCESSO DE INFERÊNCIA ---
-# Definição textual das regras para depuração
-_REGRAS_DEBUG = [
-    {
-        "desc": "Se erro é POS e de é POS então PCRAC é ALTA",
-        "ants": [("erro", "pos"), ("de", "pos")],
-        "out": "alta",
-    },
-    {
-        "desc": "Se erro é POS e de é ZERO então PCRAC é ALTA",
-        "ants": [("erro", "pos"), ("de", "zero")],
-        "out": "alta",
-    },
-    {
-        "desc": "Se erro é POS e de é NEG então PCRAC é MÉDIA",
-        "ants": [("erro", "pos"), ("de", "neg")],
-        "out": "media",
-    },
-    {
-        "desc": "Se erro é ZERO e de é POS então PCRAC é ALTA",
-        "ants": [("erro", "zero"), ("de", "pos")],
-        "out": "alta",
-    },
-    {
-        "desc": "Se erro é ZERO e de é ZERO então PCRAC é MÉDIA",
-        "ants": [("erro", "zero"), ("de", "zero")],
-        "out": "media",
-    },
-    {
-        "desc": "Se erro é ZERO e de é NEG então PCRAC é BAIXA",
-        "ants": [("erro", "zero"), ("de", "neg")],
-        "out": "baixa",
-    },
-    {
-        "desc": "Se erro é NEG e de é POS então PCRAC é MÉDIA",
-        "ants": [("erro", "neg"), ("de", "pos")],
-        "out": "media",
-    },
-    {
-        "desc": "Se erro é NEG e de é ZERO então PCRAC é BAIXA",
-        "ants": [("erro", "neg"), ("de", "zero")],
-        "out": "baixa",
-    },
-    {
-        "desc": "Se erro é NEG e de é NEG então PCRAC é BAIXA",
-        "ants": [("erro", "neg"), ("de", "neg")],
-        "out": "baixa",
-    },
-    {
-        "desc": "Se Temperatura Externa é ALTA então PCRAC é ALTA",
-        "ants": [("text", "alta")],
-        "out": "alta",
-    },
-    {
-        "desc": "Se Temperatura Externa é BAIXA então PCRAC é BAIXA",
-        "ants": [("text", "baixa")],
-        "out": "baixa",
-    },
-    {
-        "desc": "Se Carga Térmica é ALTA então PCRAC é ALTA",
-        "ants": [("qest", "alta")],
-        "out": "alta",
-    },
-]
+# Regras com descrição textual (geradas da especificação)
+_REGRAS_DEBUG = tabelas.regras
 
 def fuzzy_debug(e, de, Text, Qest):
     """
@@ -197,34 +155,14 @@ def fuzzy_debug(e, de, Text, Qest):
     Retorna um dicionário para visualização no GUI.
     """
     # Cálculo dos graus de pertinência das entradas
-    mus = {
-        "erro": {
-            "neg": fuzz.interp_membership(erro_univ, erro_var["neg"].mf, e),
-            "zero": fuzz.interp_membership(erro_univ, erro_var["zero"].mf, e),
-            "pos": fuzz.interp_membership(erro_univ, erro_var["pos"].mf, e),
-        },
-        "de": {
-            "neg": fuzz.interp_membership(de_univ, de_var["neg"].mf, de),
-            "zero": fuzz.interp_membership(de_univ, de_var["zero"].mf, de),
-            "pos": fuzz.interp_membership(de_univ, de_var["pos"].mf, de),
-        },
-        "text": {
-            "baixa": fuzz.interp_membership(text_univ, text_var["baixa"].mf, Text),
-            "media": fuzz.interp_membership(text_univ, text_var["media"].mf, Text),
-            "alta": fuzz.interp_membership(text_univ, text_var["alta"].mf, Text),
-        },
-        "qest": {
-            "baixa": fuzz.interp_membership(qest_univ, qest_var["baixa"].mf, Qest),
-            "media": fuzz.interp_membership(qest_univ, qest_var["media"].mf, Qest),
-            "alta": fuzz.interp_membership(qest_univ, qest_var["alta"].mf, Qest),
-        },
-    }
+    mus = {}
+    for nome, x in zip(ENTRADAS, (e, de, Text, Qest)):
+        mus[nome] = {
+            termo: fuzz.interp_membership(tabelas.universos[nome], mf, x)
+            for termo, mf in zip(tabelas.termos[nome], tabelas.mfs[nome])
+        }
 
-    saidas_mf = {
-        "baixa": pcrac_var["baixa"].mf,
-        "media": pcrac_var["media"].mf,
-        "alta": pcrac_var["alta"].mf,
-    }
+    saidas_mf = dict(zip(tabelas.termos[tabelas.saida], tabelas.mfs[tabelas.saida]))
 
     agregado = np.zeros_like(pcrac_univ)
     debug_regras = []
@@ -265,13 +203,128 @@ def fuzzy_debug(e, de, Text, Qest):
         "mus_entrada": mus,
     }
 
+# --- INFERÊNCIA VETORIZADA (LOTE) ---
+# Mesma base de regras, avaliada em arrays numpy de uma vez a partir das
+# tabelas compiladas (padrão: controlador.json; outra sala = outras tabelas):
+# min nos antecedentes, max por termo de saída, centróide exato do agregado
+# linear por partes no universo de 100 pontos (difere do skfuzzy < 0.05 %).
+#
+# Modos alternativos (mais baratos ou com outra defuzzificação):
+#   centroide   - min / max / centróide (equivale ao controlador atual)
+#   bisector    - min / max / bissetor da área
+#   mom         - min / max / média dos máximos
+#   produto     - implicação por produto / max / centróide
+#   sugeno      - consequentes singleton (centróide de cada termo), média
+#                 ponderada pelos graus de cada regra; sem agregação
+#   media_picos - média dos picos dos termos ponderada pelos cortes
+MODOS_INFERENCIA = ("centroide", "bisector", "mom", "produto", "sugeno", "media_picos")
+_LOTE_MAX = 4096
+
+def _defuzz_lote(cortes, modo, tab):
+    # cortes: (termos, N) -> agregado (N, pontos) -> valor defuzzificado (N,)
+    mf_saida = tab.mfs[tab.saida]
+    univ = tab.universos[tab.saida]
+    if modo == "produto":
+        agregado = np.max(cortes[:, :, None] * mf_saida[:, None, :], axis=0)
+    else:
+        agregado = np.max(np.minimum(cortes[:, :, None], mf_saida[:, None, :]), axis=0)
+    y1 = agregado[:, :-1]
+    y2 = agregado[:, 1:]
+    x1 = univ[:-1]
+    x2 = univ[1:]
+    h = x2 - x1
+    area_seg = h * (y1 + y2) / 2
+    area = np.sum(area_seg, axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if modo == "mom":
+            maximo = np.max(agregado, axis=1, keepdims=True)
+            no_max = agregado >= maximo - 1e-12
+            saida = np.sum(no_max * univ, axis=1) / np.sum(no_max, axis=1)
+        elif modo == "bisector":
+            # Segmento onde a área acumulada passa da metade; dentro dele
+            # resolve y1*d + (y2-y1)/(2h)*d² = resto para a distância d
+            acum = np.cumsum(area_seg, axis=1)
+            j = np.argmax(acum >= area[:, None] / 2, axis=1)
+            lin = np.arange(len(j))
+            resto = area / 2 - (acum[lin, j] - area_seg[lin, j])
+            a = (y2[lin, j] - y1[lin, j]) / (2 * h[j])
+            b = y1[lin, j]
+            d = np.where(np.abs(a) > 1e-12,
+                         (-b + np.sqrt(np.maximum(b * b + 4 * a * resto, 0))) / (2 * a),
+                         resto / b)
+            saida = x1[j] + np.clip(d, 0, h[j])
+        else:
+            momento = np.sum(h * (x1 * (2 * y1 + y2) + x2 * (y1 + 2 * y2)), axis=1) / 6
+            saida = momento / area
+        return np.where(area > 0, saida, np.nan)
+
+def _media_ponderada(pesos, valores):
+    # pesos: (K, N), valores: (K,) -> (N,)
+    soma = np.sum(pesos, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(soma > 0, valores @ pesos / soma, np.nan)
+
+def forcas_regras_lote(e, de, Text, Qest, controlador=None):
+    """Graus de ativação das regras, shape (n_regras, *shape das entradas)."""
+    tab = controlador or tabelas
+    entradas = dict(zip(ENTRADAS,
+                        np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                              for v in (e, de, Text, Qest)))))
+    mus = {}
+    forcas = []
+    for reg in tab.regras:
+        alpha = None
+        for (var, termo) in reg["ants"]:
+            if (var, termo) not in mus:
+                mus[(var, termo)] = np.interp(entradas[var], tab.universos[var],
+                                              tab.mf(var, termo))
+            mu = mus[(var, termo)]
+            alpha = mu if alpha is None else np.fmin(alpha, mu)
+        forcas.append(alpha)
+    return np.array(forcas)
+
+def fuzzy_lote(e, de, Text, Qest, modo="centroide", controlador=None):
+    """
+    Inferência bruta (sem suavização) para arrays de entradas (com broadcast).
+    Retorna NaN onde nenhuma regra dispara (equivalente ao None de fuzzy_bruto).
+    controlador: tabelas compiladas (carregar_controlador); padrão = controlador.json.
+    """
+    if modo not in MODOS_INFERENCIA:
+        raise ValueError(f"Modo de inferência desconhecido: {modo}")
+    tab = controlador or tabelas
+    termos_saida = tab.termos[tab.saida]
+
+    forcas = forcas_regras_lote(e, de, Text, Qest, tab)
+    forma = forcas.shape[1:]
+    forcas = forcas.reshape(len(tab.regras), -1)
+
+    if modo == "sugeno":
+        centros = np.array([tab.centros_saida[termos_saida.index(reg["out"])]
+                            for reg in tab.regras])
+        return _media_ponderada(forcas, centros).reshape(forma)
+
+    cortes = np.zeros((len(termos_saida), forcas.shape[1]))
+    for i, reg in enumerate(tab.regras):
+        k = termos_saida.index(reg["out"])
+        np.fmax(cortes[k], forcas[i], out=cortes[k])
+
+    if modo == "media_picos":
+        return _media_ponderada(cortes, tab.picos_saida).reshape(forma)
+
+    saida = np.empty(forcas.shape[1])
+    for ini in range(0, forcas.shape[1], _LOTE_MAX):
+        saida[ini:ini + _LOTE_MAX] = _defuzz_lote(cortes[:, ini:ini + _LOTE_MAX], modo, tab)
+    return saida.reshape(forma)
+
 # --- CENÁRIOS DIÁRIOS ---
 def get_temp_externa(t):
     t_h = t / 60
     return 25 + 7*np.sin(2*np.pi*(t_h - 9)/24) + random.gauss(0, 0.5)
 
 def get_carga_termica(t):
-    t_h = t / 60
+    # Perfil diário: repete a cada 24h em simulações de vários dias
+    t_h = (t / 60) % 24
     # Interpolando perfil suave
     horas = [0, 6, 12, 18, 24]
     cargas = [20, 30, 80, 70, 20]
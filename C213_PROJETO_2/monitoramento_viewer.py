@@ -15,6 +15,9 @@ PORT = 1883
 TOPIC_ROOT = "datacenter/fuzzy/#"
 CLIENT_ID = f"viewer_{random.randint(1000, 9999)}"
 
+# Cor do card de status por nível publicado em datacenter/fuzzy/alert
+CORES_NIVEL = {"NORMAL": "green", "AVISO": "orange", "CRITICO": "red"}
+
 class DashboardApp:
     def __init__(self, root):
         self.root = root
@@ -107,6 +110,7 @@ class DashboardApp:
                     self.historico_t.clear()
                     self.historico_temp.clear()
                     self.historico_crac.clear()
+                    self.root.after(0, lambda: self.update_status("NORMAL", "NORMAL"))
                 
                 self.ultimo_minuto = minuto
 
@@ -125,10 +129,10 @@ class DashboardApp:
                 self.root.after(0, lambda: self.update_cards(None, crac))
                 self.root.after(0, self.update_plot)
 
-            # 3. ALERTA
+            # 3. ALERTA (só chega na mudança de nível; o status fica até a próxima)
             elif "alert" in topic:
                 d = json.loads(payload)
-                self.root.after(0, lambda: self.lbl_alert.config(text=f"⚠️ {d.get('msg')}", foreground="red"))
+                self.root.after(0, lambda: self.update_status(d.get("nivel", "CRITICO"), d.get("msg")))
 
         except Exception as e:
             print(f"Erro msg: {e}")
@@ -136,11 +140,13 @@ class DashboardApp:
     def update_cards(self, temp, crac):
         if temp is not None:
             self.lbl_temp.config(text=f"{temp:.1f} °C")
-            if 18 <= temp <= 26:
-                self.lbl_alert.config(text="NORMAL", foreground="green")
         if crac is not None:
             self.lbl_crac.config(text=f"{crac:.1f} %")
 
+    def update_status(self, nivel, msg):
+        texto = msg if nivel == "NORMAL" else f"⚠️ {msg}"
+        self.lbl_alert.config(text=texto, foreground=CORES_NIVEL.get(nivel, "red"))
+
     def update_plot(self):
         # Limpa TUDO para garantir que não sobrem linhas antigas
         self.ax.clear()
@@ -0,0 +1,261 @@
+# nucleo.py – PASSO FUNDIDO CONTROLADOR + PLANTA (LOTE/FROTA)
+import numpy as np
+
+from main import tabelas
+from especificacao import ENTRADAS
+from simulacao import MINUTOS_DIA
+
+# Linhas do array de estado (4, N) e do array de entradas (2, N)
+T, PREV, E_ANT, SP = range(4)
+EXT, QEST = range(2)
+
+# Saturação das entradas do controlador (mesma do loop da simulação)
+LIMITES = {"erro": (-10, 10), "de": (-2, 2), "text": (10, 35), "qest": (0, 100)}
+
+# Modelo físico (mesmos coeficientes de main.modelo_fisico)
+A_T, B_PCRAC, C_QEST, D_TEXT, E_CONST = 0.9, -0.08, 0.05, 0.02, 3.5
+
+
+def _pesos_centroide(x):
+    # Área e momento do agregado linear por partes são lineares em y:
+    # area = y @ pa, momento = y @ pm (fórmula exata por segmento)
+    h = np.diff(x)
+    pa = np.zeros_like(x)
+    pm = np.zeros_like(x)
+    pa[:-1] += h / 2
+    pa[1:] += h / 2
+    pm[:-1] += h * (2 * x[:-1] + x[1:]) / 6
+    pm[1:] += h * (x[:-1] + 2 * x[1:]) / 6
+    return pa, pm
+
+
+class NucleoPasso:
+    """
+    Um minuto de simulação para N salas numa única passada:
+    saturação -> pertinências -> regras -> agregação -> centróide ->
+    suavização 0.7/0.3 -> modelo físico.
+
+    estado:   array (4, N) com linhas T, PREV, E_ANT, SP (atualizado no lugar)
+    entradas: array (2, N) com linhas EXT, QEST
+
+    Todos os intermediários usam buffers alocados no construtor
+    (ufuncs com out=, sem operandos em broadcast nem conversões de tipo,
+    que fariam o numpy criar buffers internos), então passo() não aloca
+    arrays: sobram só ~2 KB de objetos por chamada, independente de N.
+    Cada etapa é uma ou poucas chamadas numpy sobre todas as regras/termos.
+
+    controlador: tabelas compiladas (carregar_controlador); padrão = controlador.json.
+    """
+    def __init__(self, n=1, controlador=None):
+        tab = controlador or tabelas
+        entradas = ENTRADAS
+        termos_saida = tab.termos[tab.saida]
+        self.n = n
+        nu = len(tab.universos[tab.saida])
+        self.peso_area, self.peso_momento = _pesos_centroide(tab.universos[tab.saida])
+
+        # Pares (variável, termo) usados pelas regras; MFs empilhadas numa tabela plana
+        pares = []
+        for reg in tab.regras:
+            for par in reg["ants"]:
+                if par not in pares:
+                    pares.append(par)
+        self.pares = pares
+        self.var_par = np.array([entradas.index(v) for (v, _) in pares])
+        mfs = [tab.mf(v, t) for (v, t) in pares]
+        self.tabela_mf = np.concatenate(mfs)
+        # Constantes por linha já repetidas para as N salas: ufuncs com um
+        # operando em broadcast (k, 1) alocam buffers internos a cada chamada
+        def colunas(valores):
+            return np.repeat(np.array(valores, dtype=float)[:, None], n, axis=1)
+
+        self.offset_par = colunas(np.cumsum([0] + [len(m) for m in mfs[:-1]]))
+
+        # Universos uniformes: posição = (x - x0) / dx, índice inteiro + fração
+        univs = [tab.universos[v] for v in entradas]
+        self.x0 = colunas([u[0] for u in univs])
+        self.dx = colunas([u[1] - u[0] for u in univs])
+        self.pos_max = colunas([len(u) - 1 for u in univs])
+        self.pos_ult = self.pos_max - 1
+        self.lim_inf = colunas([LIMITES[v][0] for v in entradas])
+        self.lim_sup = colunas([LIMITES[v][1] for v in entradas])
+
+        # Regras ordenadas por termo de saída: os cortes saem de um reduceat.
+        # Antecedentes numa matriz (n_ant_max, n_regras); regras mais curtas
+        # repetem o último par (min(a, a) = a).
+        self.ordem = sorted(range(len(tab.regras)),
+                            key=lambda i: termos_saida.index(tab.regras[i]["out"]))
+        ants = [tab.regras[i]["ants"] for i in self.ordem]
+        n_ant = max(len(a) for a in ants)
+        self.ants = np.array([[pares.index(a[min(j, len(a) - 1)]) for a in ants]
+                              for j in range(n_ant)])
+        # Só termos de saída com alguma regra entram no reduceat e na agregação
+        # (um termo sem regra tem corte 0 e não contribui para o máximo)
+        saidas = [termos_saida.index(tab.regras[i]["out"]) for i in self.ordem]
+        usados = sorted(set(saidas))
+        self.inicio_termo = np.array([saidas.index(k) for k in usados])
+        # MFs da saída também repetidas; os cortes entram por copyto, que
+        # faz o broadcast sem buffer
+        self.mf_saida = np.repeat(tab.mfs[tab.saida][usados][:, None, :], n, axis=1)
+
+        nv, npar, nr, nt = len(entradas), len(pares), len(self.ordem), len(usados)
+        self.erro = np.empty(n)
+        self.ent = np.empty((nv, n))
+        self.pos = np.empty((nv, n))
+        self.piso = np.empty((nv, n))
+        self.idx = np.empty((npar, n), dtype=np.intp)
+        self.frac_par = np.empty((npar, n))
+        self.mu = np.empty((npar, n))
+        self.mu_b = np.empty((npar, n))
+        self.f1 = np.empty((nr, n))
+        self.forcas = np.empty((nr, n))
+        self.cortes = np.empty((nt, n))
+        self.tmp = np.empty((nt, n, nu))
+        self.agregado = np.empty((n, nu))
+        self.area = np.empty(n)
+        self.momento = np.empty(n)
+        self.valido = np.empty(n, dtype=bool)
+        self.invalido = np.empty(n, dtype=bool)
+        self.raw = np.empty(n)
+        self.pcrac = np.empty(n)
+        self.a = np.empty(n)
+        self.t_next = np.empty(n)
+
+    def _pertinencias(self):
+        # Posição fracionária no universo de cada variável
+        pos, piso = self.pos, self.piso
+        np.subtract(self.ent, self.x0, out=pos)
+        np.divide(pos, self.dx, out=pos)
+        np.maximum(pos, 0, out=pos)
+        np.minimum(pos, self.pos_max, out=pos)
+        np.floor(pos, out=piso)
+        np.minimum(piso, self.pos_ult, out=piso)
+
+        # Índice na tabela plana de cada par e interpolação linear.
+        # Índices válidos por construção: mode="clip" evita que o take
+        # (mode="raise") bufferize a saída num array temporário.
+        idx = self.idx
+        np.take(piso, self.var_par, axis=0, out=self.frac_par, mode="clip")
+        np.take(pos, self.var_par, axis=0, out=self.mu, mode="clip")
+        # Soma em float e converte com copyto (add com casting para intp bufferiza)
+        np.add(self.frac_par, self.offset_par, out=self.mu_b)
+        np.copyto(idx, self.mu_b, casting="unsafe")
+        np.subtract(self.mu, self.frac_par, out=self.frac_par)
+
+        np.take(self.tabela_mf, idx, out=self.mu, mode="clip")
+        idx += 1
+        np.take(self.tabela_mf, idx, out=self.mu_b, mode="clip")
+        np.subtract(self.mu_b, self.mu, out=self.mu_b)
+        np.multiply(self.mu_b, self.frac_par, out=self.mu_b)
+        np.add(self.mu, self.mu_b, out=self.mu)
+
+    def _inferencia(self):
+        """PCRAC bruto em self.raw e máscara de defuzzificação válida."""
+        self._pertinencias()
+
+        # Ativação (min dos antecedentes) e corte por termo (max das regras)
+        np.take(self.mu, self.ants[0], axis=0, out=self.forcas, mode="clip")
+        for ant in self.ants[1:]:
+            np.take(self.mu, ant, axis=0, out=self.f1, mode="clip")
+            np.fmin(self.f1, self.forcas, out=self.forcas)
+        np.maximum.reduceat(self.forcas, self.inicio_termo, axis=0, out=self.cortes)
+
+        # Agregação (max dos termos cortados) e centróide exato
+        np.copyto(self.tmp, self.cortes[:, :, None])
+        np.minimum(self.tmp, self.mf_saida, out=self.tmp)
+        np.max(self.tmp, axis=0, out=self.agregado)
+        np.dot(self.agregado, self.peso_area, out=self.area)
+        np.dot(self.agregado, self.peso_momento, out=self.momento)
+        np.greater(self.area, 0, out=self.valido)
+        np.divide(self.momento, self.area, out=self.raw, where=self.valido)
+
+    def forcas_regras(self):
+        """Graus de ativação do último passo, na ordem das regras (cópia)."""
+        saida = np.empty_like(self.forcas)
+        saida[self.ordem] = self.forcas
+        return saida
+
+    def passo(self, estado, entradas):
+        """Avança estado um minuto; PCRAC aplicado fica em self.pcrac."""
+        Tv, prev = estado[T], estado[PREV]
+        ext, qest = entradas[EXT], entradas[QEST]
+
+        # Erro, delta do erro e saturação das entradas
+        ent = self.ent
+        np.subtract(Tv, estado[SP], out=self.erro)
+        np.copyto(ent[0], self.erro)
+        np.subtract(self.erro, estado[E_ANT], out=ent[1])
+        np.copyto(ent[2], ext)
+        np.copyto(ent[3], qest)
+        np.maximum(ent, self.lim_inf, out=ent)
+        np.minimum(ent, self.lim_sup, out=ent)
+
+        self._inferencia()
+
+        # Sem regra ativa: raw = Prev (mesmo fallback de fuzzy_controller)
+        np.logical_not(self.valido, out=self.invalido)
+        np.copyto(self.raw, prev, where=self.invalido)
+        np.multiply(self.raw, 0.3, out=self.pcrac)
+        np.multiply(prev, 0.7, out=self.a)
+        np.add(self.pcrac, self.a, out=self.pcrac)
+
+        # Modelo físico (com as entradas sem saturação)
+        np.multiply(Tv, A_T, out=self.t_next)
+        np.multiply(self.pcrac, B_PCRAC, out=self.a)
+        np.add(self.t_next, self.a, out=self.t_next)
+        np.multiply(qest, C_QEST, out=self.a)
+        np.add(self.t_next, self.a, out=self.t_next)
+        np.multiply(ext, D_TEXT, out=self.a)
+        np.add(self.t_next, self.a, out=self.t_next)
+        np.add(self.t_next, E_CONST, out=self.t_next)
+
+        np.copyto(estado[E_ANT], self.erro)
+        np.copyto(estado[PREV], self.pcrac)
+        np.copyto(Tv, self.t_next)
+        return self.pcrac
+
+
+# --- CENÁRIO VETORIZADO (UMA SÉRIE ALEATÓRIA POR SALA) ---
+_HORAS_CARGA = [0, 6, 12, 18, 24]
+_CARGAS = [20, 30, 80, 70, 20]
+
+def cenario_lote(t, rng, entradas):
+    """Mesmo perfil de get_temp_externa/get_carga_termica, escrito em entradas."""
+    t_h = t / 60
+    ext, qest = entradas[EXT], entradas[QEST]
+    rng.standard_normal(out=ext)
+    np.multiply(ext, 0.5, out=ext)
+    np.add(ext, 25 + 7 * np.sin(2 * np.pi * (t_h - 9) / 24), out=ext)
+
+    rng.random(out=qest)
+    np.multiply(qest, 4, out=qest)
+    np.add(qest, float(np.interp(t_h % 24, _HORAS_CARGA, _CARGAS)) - 2, out=qest)
+    np.clip(qest, 0, 100, out=qest)
+
+
+def simular_lote(sp, erro_inicial=0.0, horizonte=MINUTOS_DIA, semente=None,
+                 controlador=None):
+    """
+    Simula N salas em paralelo (sp e erro_inicial escalares ou arrays).
+    Retorna (T, PCRAC), cada um com shape (horizonte, N).
+    """
+    sp, erro_inicial = np.broadcast_arrays(np.atleast_1d(np.asarray(sp, dtype=float)),
+                                           np.asarray(erro_inicial, dtype=float))
+    n = sp.shape[0]
+    rng = np.random.default_rng(semente)
+
+    estado = np.empty((4, n))
+    estado[T] = sp + erro_inicial
+    estado[PREV] = 50.0
+    estado[E_ANT] = 0.0
+    estado[SP] = sp
+    entradas = np.empty((2, n))
+
+    nucleo = NucleoPasso(n, controlador)
+    hist_T = np.empty((horizonte, n))
+    hist_P = np.empty((horizonte, n))
+    for t in range(horizonte):
+        cenario_lote(t, rng, entradas)
+        hist_T[t] = estado[T]
+        hist_P[t] = nucleo.passo(estado, entradas)
+    return hist_T, hist_P
@@ -0,0 +1,312 @@
+# regressao.py – REGRESSÃO DOS MOTORES CONTRA TRAJETÓRIAS DE REFERÊNCIA
+# Uso: python regressao.py [--gerar] [--variantes a,b,...] [--processos N] [--detalhado]
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from main import (
+    fuzzy_controller,
+    fuzzy_debug,
+    forcas_regras_lote,
+    modelo_fisico,
+    CacheControlador,
+    MODOS_INFERENCIA,
+    tabelas,
+)
+from simulacao import simular
+from nucleo import NucleoPasso, LIMITES, T, PREV, E_ANT, SP, EXT, QEST
+
+ARQ_REFERENCIA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "referencia", "trajetorias_24h.npz")
+
+# Matriz de cenários: setpoints da GUI x erros iniciais, uma semente por cenário
+SETPOINTS = (16, 22, 26, 32)
+ERROS_INICIAIS = (-5.0, 0.0, 5.0)
+SEMENTE_BASE = 1000
+
+
+def casos():
+    """(setpoint, erro inicial, semente) de cada cenário."""
+    pares = [(sp, e) for sp in SETPOINTS for e in ERROS_INICIAIS]
+    return [(sp, e, SEMENTE_BASE + i) for i, (sp, e) in enumerate(pares)]
+
+
+# --- GERAÇÃO DA REFERÊNCIA ---
+def _entradas_saturadas(erro, ext, qest):
+    # Entradas do controlador a cada minuto, saturadas como em simular()
+    de = np.diff(erro, prepend=0.0)
+    return np.array([np.clip(erro, -10, 10), np.clip(de, -2, 2),
+                     np.clip(ext, 10, 35), np.clip(qest, 0, 100)])
+
+
+def trajetoria_referencia(caso):
+    """
+    Mesmo laço de thread_simulacao (fuzzy_controller skfuzzy + modelo_fisico),
+    com as forças das regras do motor de debug em cada minuto.
+    """
+    sp, erro_inicial, semente = caso
+    linhas = np.array(list(simular(sp, erro_inicial, semente=semente)))
+    ent = _entradas_saturadas(linhas[:, 5], linhas[:, 3], linhas[:, 4])
+    forcas = np.array([[r["alpha"] for r in fuzzy_debug(*ent[:, t])["regras"]]
+                       for t in range(ent.shape[1])])
+    return {"T": linhas[:, 1], "PCRAC": linhas[:, 2], "ext": linhas[:, 3],
+            "qest": linhas[:, 4], "forcas": forcas}
+
+
+def gerar_referencia(processos=None, arquivo=ARQ_REFERENCIA):
+    lista = casos()
+    with ProcessPoolExecutor(processos) as pool:
+        trajs = list(pool.map(trajetoria_referencia, lista))
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    np.savez_compressed(
+        arquivo,
+        casos=np.array(lista, dtype=float),
+        controlador=np.array(tabelas.hash),
+        **{campo: np.array([tr[campo] for tr in trajs])
+           for campo in ("T", "PCRAC", "ext", "qest", "forcas")},
+    )
+
+
+def carregar_referencia(arquivo=ARQ_REFERENCIA):
+    with np.load(arquivo) as dados:
+        return {k: dados[k] for k in dados.files}
+
+
+# --- VARIANTES ---
+# Cada variante é uma fábrica criar(n) -> passo(estado, entradas), com o
+# mesmo contrato de NucleoPasso.passo: estado (4, N) avança no lugar e o
+# passo devolve (PCRAC, forças das regras (n_regras, N) ou None).
+# Forças e planta só são conferidas quando saem do caminho da própria
+# variante (forças != None; passo.planta_propria); senão a coluna fica "—".
+def _variante_controlador(modo=None, cache=False):
+    """fuzzy_controller + modelo_fisico, sala a sala (o laço de simular())."""
+    # Sem cache, os modos vetorizados inferem com forcas_regras_lote nas
+    # próprias entradas; skfuzzy e cache (ponto quantizado) não expõem forças
+    forcas_proprias = modo is not None and not cache
+
+    def criar(n):
+        c = CacheControlador(modo=modo) if cache else None
+
+        def passo(estado, entradas):
+            erro = estado[T] - estado[SP]
+            ent = np.array([erro, erro - estado[E_ANT], entradas[EXT], entradas[QEST]])
+            np.clip(ent, _LIM_INF, _LIM_SUP, out=ent)
+            pcrac = np.array([fuzzy_controller(*ent[:, k], estado[PREV, k], cache=c, modo=modo)
+                              for k in range(n)])
+            estado[T] = modelo_fisico(estado[T], pcrac, entradas[QEST], entradas[EXT])
+            estado[PREV] = pcrac
+            estado[E_ANT] = erro
+            return pcrac, forcas_regras_lote(*ent) if forcas_proprias else None
+        passo.planta_propria = False
+        return passo
+    return criar
+
+
+def _variante_nucleo(n):
+    nucleo = NucleoPasso(n)
+
+    def passo(estado, entradas):
+        return nucleo.passo(estado, entradas).copy(), nucleo.forcas_regras()
+    passo.planta_propria = True
+    return passo
+
+
+_LIM_INF = np.array([[LIMITES[v][0]] for v in tabelas.entradas], dtype=float)
+_LIM_SUP = np.array([[LIMITES[v][1]] for v in tabelas.entradas], dtype=float)
+
+# Tolerâncias (máximo |Δ|) do passo isolado e da trajetória em malha fechada.
+# No passo, PCRAC difere só pela defuzzificação (skfuzzy reamostra o universo:
+# |Δbruto| < 0.06, x0.3 da suavização); na malha fechada essas diferenças se
+# acumulam pelo delta do erro, então a trajetória tem tolerância própria,
+# ajustada logo acima do pior caso observado na matriz (centroide/nucleo:
+# máx|ΔT| 0.56, RMS 0.071, máx|ΔP| 7.5; cache: 0.53, 0.104, 7.7, passo 3.05).
+# O cache responde no ponto quantizado (PASSOS_PADRAO), daí o passo mais largo.
+TOL_EXATA = {"passo_P": 1e-9, "passo_alpha": 1e-9, "passo_planta": 1e-9,
+             "traj_T": 1e-9, "traj_rms_T": 1e-9, "traj_P": 1e-9}
+TOL_CENTROIDE = {"passo_P": 0.02, "passo_alpha": 1e-9, "passo_planta": 1e-9,
+                 "traj_T": 0.65, "traj_rms_T": 0.08, "traj_P": 8.0}
+TOL_CACHE = {"passo_P": 3.5, "passo_alpha": 1e-9, "passo_planta": 1e-9,
+             "traj_T": 0.6, "traj_rms_T": 0.12, "traj_P": 8.5}
+
+# nome -> (fábrica, tolerâncias; None = aproximação, só relatório).
+# "skfuzzy" repete a própria referência (~40 s por cenário) e só roda
+# quando pedido em --variantes.
+VARIANTES = {
+    "skfuzzy": (_variante_controlador(), TOL_EXATA),
+    "centroide": (_variante_controlador(modo="centroide"), TOL_CENTROIDE),
+    "nucleo": (_variante_nucleo, TOL_CENTROIDE),
+    # Cache sobre o motor centroide: mede só o efeito da quantização
+    "cache": (_variante_controlador(modo="centroide", cache=True), TOL_CACHE),
+}
+for _modo in MODOS_INFERENCIA[1:]:
+    VARIANTES[_modo] = (_variante_controlador(modo=_modo), None)
+VARIANTES_PADRAO = [v for v in VARIANTES if v != "skfuzzy"]
+
+
+# --- COMPARAÇÃO ---
+def _estado_inicial(sp, erro_inicial):
+    return np.array([[sp + erro_inicial], [50.0], [0.0], [sp]])
+
+
+def trajetoria(nome, sp, erro_inicial, ext, qest):
+    """24h em malha fechada com o cenário gravado (ext/qest) da referência."""
+    passo = VARIANTES[nome][0](1)
+    estado = _estado_inicial(sp, erro_inicial)
+    entradas = np.empty((2, 1))
+    n = len(ext)
+    hist_T, hist_P = np.empty(n), np.empty(n)
+    for t in range(n):
+        entradas[EXT], entradas[QEST] = ext[t], qest[t]
+        hist_T[t] = estado[T, 0]
+        hist_P[t] = passo(estado, entradas)[0][0]
+    return hist_T, hist_P
+
+
+def passo_isolado(nome, sp, T_ref, P_ref, ext, qest):
+    """
+    Todos os minutos de uma vez (N = 1440), cada um partindo do estado da
+    referência: isola o erro do motor do acúmulo da malha fechada.
+    """
+    n = len(T_ref)
+    erro = T_ref - sp
+    estado = np.array([T_ref, np.r_[50.0, P_ref[:-1]], np.r_[0.0, erro[:-1]], np.full(n, sp)])
+    passo = VARIANTES[nome][0](n)
+    pcrac, forcas = passo(estado, np.array([ext, qest]))
+    return pcrac, forcas, estado[T] if passo.planta_propria else None
+
+
+def _avaliar(args):
+    nome, i, sp, erro_inicial, ref = args
+    t0 = time.perf_counter()
+    P_passo, F_passo, T_passo = passo_isolado(nome, sp, ref["T"], ref["PCRAC"],
+                                              ref["ext"], ref["qest"])
+    T_traj, P_traj = trajetoria(nome, sp, erro_inicial, ref["ext"], ref["qest"])
+    dT = T_traj - ref["T"]
+    desvios = {
+        "passo_P": float(np.max(np.abs(P_passo - ref["PCRAC"]))),
+        "passo_alpha": None,
+        "passo_planta": None,
+        "traj_T": float(np.max(np.abs(dT))),
+        "traj_rms_T": float(np.sqrt(np.mean(dT ** 2))),
+        "traj_P": float(np.max(np.abs(P_traj - ref["PCRAC"]))),
+    }
+    if F_passo is not None:
+        desvios["passo_alpha"] = float(np.max(np.abs(F_passo.T - ref["forcas"])))
+    if T_passo is not None:
+        # Planta conferida com o próprio PCRAC da variante: só o modelo físico conta
+        T_planta = modelo_fisico(ref["T"], P_passo, ref["qest"], ref["ext"])
+        desvios["passo_planta"] = float(np.max(np.abs(T_passo - T_planta)))
+    return nome, i, desvios, time.perf_counter() - t0
+
+
+def comparar(ref, variantes=None, processos=None):
+    """
+    Roda cada variante em cada cenário (em paralelo) e devolve uma linha
+    por (variante, cenário) com os desvios máximos e o veredito.
+    """
+    variantes = variantes or VARIANTES_PADRAO
+    tarefas = [(nome, i, sp, e, {k: ref[k][i] for k in ("T", "PCRAC", "ext", "qest", "forcas")})
+               for nome in variantes
+               for i, (sp, e, _) in enumerate(ref["casos"])]
+    with ProcessPoolExecutor(processos) as pool:
+        resultados = list(pool.map(_avaliar, tarefas))
+
+    linhas = []
+    for nome, i, desvios, segundos in resultados:
+        tol = VARIANTES[nome][1]
+        if tol is None:
+            veredito = "info"
+        else:
+            estourou = [k for k in tol if desvios[k] is not None and desvios[k] > tol[k]]
+            veredito = "FALHA: " + ", ".join(estourou) if estourou else "ok"
+        sp, e, semente = ref["casos"][i]
+        linhas.append({"variante": nome, "sp": sp, "erro": e, "semente": int(semente),
+                       "segundos": segundos, "veredito": veredito, **desvios})
+    return linhas
+
+
+_METRICAS = ("passo_P", "passo_alpha", "passo_planta", "traj_T", "traj_rms_T", "traj_P")
+
+
+def _cabecalho(primeira):
+    cab = (f"{'':<23} {'-------- passo isolado --------':>32} "
+           f"{'------ trajetória 24h ------':>29}\n"
+           f"{primeira:<23} {'Máx|ΔP|':>10} {'Máx|Δα|':>10} {'Planta':>10} "
+           f"{'Máx|ΔT|':>9} {'RMS ΔT':>9} {'Máx|ΔP|':>9} {'Tempo(s)':>9}  Resultado")
+    return [cab, "-" * len(cab.splitlines()[-1])]
+
+
+def _num(valor, largura):
+    return f"{'—':>{largura}}" if valor is None else f"{valor:>{largura}.2e}"
+
+
+def _linha(rotulo, l):
+    return (f"{rotulo:<23} {_num(l['passo_P'], 10)} {_num(l['passo_alpha'], 10)} "
+            f"{_num(l['passo_planta'], 10)} {_num(l['traj_T'], 9)} {_num(l['traj_rms_T'], 9)} "
+            f"{_num(l['traj_P'], 9)} {l['segundos']:>9.2f}  {l['veredito']}")
+
+
+def relatorio(linhas, detalhado=False):
+    """
+    Pior caso de cada variante na matriz inteira; cenários reprovados (ou
+    todos, com detalhado=True) aparecem em seguida, um por linha.
+    """
+    saida = _cabecalho("Variante (pior caso)")
+    for nome in dict.fromkeys(l["variante"] for l in linhas):
+        grupo = [l for l in linhas if l["variante"] == nome]
+        pior = {k: max((l[k] for l in grupo if l[k] is not None), default=None)
+                for k in _METRICAS}
+        pior["segundos"] = sum(l["segundos"] for l in grupo)
+        reprovados = sum(l["veredito"].startswith("FALHA") for l in grupo)
+        if VARIANTES[nome][1] is None:
+            pior["veredito"] = "info"
+        else:
+            pior["veredito"] = (f"FALHA em {reprovados}/{len(grupo)}" if reprovados
+                                else f"ok ({len(grupo)} cenários)")
+        saida.append(_linha(nome, pior))
+
+    cenarios = [l for l in linhas if detalhado or l["veredito"].startswith("FALHA")]
+    if cenarios:
+        saida.append("")
+        saida += _cabecalho("Variante / SP / Erro")
+        for l in cenarios:
+            saida.append(_linha(f"{l['variante']} / {l['sp']:.0f} / {l['erro']:+.1f}", l))
+
+    falhas = sum(l["veredito"].startswith("FALHA") for l in linhas)
+    checadas = sum(l["veredito"] != "info" for l in linhas)
+    saida.append("")
+    saida.append(f"{checadas - falhas}/{checadas} cenários dentro da tolerância"
+                 + (f", {falhas} FALHA(S)" if falhas else ""))
+    return "\n".join(saida)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Compara os motores com as trajetórias de referência.")
+    p.add_argument("--gerar", action="store_true",
+                   help="recalcula as trajetórias de referência (skfuzzy, lento)")
+    p.add_argument("--variantes", help=f"lista separada por vírgula ({', '.join(VARIANTES)})")
+    p.add_argument("--processos", type=int, help="processos em paralelo (padrão: nº de núcleos)")
+    p.add_argument("--detalhado", action="store_true", help="uma linha por cenário")
+    args = p.parse_args()
+
+    if args.gerar:
+        t0 = time.perf_counter()
+        gerar_referencia(args.processos)
+        print(f"Referência gravada em {ARQ_REFERENCIA} ({time.perf_counter() - t0:.1f} s)")
+        sys.exit(0)
+
+    ref = carregar_referencia()
+    if str(ref["controlador"]) != tabelas.hash:
+        print("Aviso: controlador.json mudou desde a geração da referência "
+              "(rode com --gerar se a mudança for intencional).")
+
+    variantes = args.variantes.split(",") if args.variantes else None
+    t0 = time.perf_counter()
+    linhas = comparar(ref, variantes, args.processos)
+    print(relatorio(linhas, args.detalhado))
+    print(f"Tempo total: {time.perf_counter() - t0:.1f} s")
+    sys.exit(1 if any(l["veredito"].startswith("FALHA") for l in linhas) else 0)
@@ -0,0 +1,70 @@
+# relatorio_modos.py – CUSTO x PRECISÃO DOS MODOS DE INFERÊNCIA
+# Uso: python relatorio_modos.py [setpoint] [erro_inicial]
+import sys
+import time
+
+import numpy as np
+
+from main import fuzzy_bruto, fuzzy_lote, MODOS_INFERENCIA
+from simulacao import simular
+
+SEMENTE = 42
+N_CHAMADAS = 300
+N_LOTE = 10000
+
+
+def _entradas(n, semente=0):
+    rng = np.random.default_rng(semente)
+    return (rng.uniform(-10, 10, n), rng.uniform(-2, 2, n),
+            rng.uniform(10, 35, n), rng.uniform(0, 100, n))
+
+
+def latencia_chamada(modo, n=N_CHAMADAS):
+    """Mediana (µs) de uma chamada escalar de fuzzy_bruto."""
+    tempos = []
+    for args in zip(*_entradas(n)):
+        t0 = time.perf_counter_ns()
+        fuzzy_bruto(*args, modo=modo)
+        tempos.append(time.perf_counter_ns() - t0)
+    return float(np.median(tempos)) / 1000
+
+
+def latencia_lote(modo, n=N_LOTE):
+    """Custo (µs) por ponto avaliando n pontos de uma vez com fuzzy_lote."""
+    ent = _entradas(n, semente=1)
+    t0 = time.perf_counter_ns()
+    fuzzy_lote(*ent, modo=modo or "centroide")
+    return (time.perf_counter_ns() - t0) / n / 1000
+
+
+def trajetoria(modo, sp, erro_inicial):
+    linhas = list(simular(sp, erro_inicial, semente=SEMENTE, modo=modo))
+    dados = np.array([l[:3] for l in linhas])
+    return dados[:, 1], dados[:, 2]
+
+
+def relatorio(sp=22.0, erro_inicial=0.0):
+    T_ref, P_ref = trajetoria(None, sp, erro_inicial)
+    linhas = [
+        f"Cenário 24h: setpoint={sp} °C, erro inicial={erro_inicial}, semente={SEMENTE}",
+        "Referência: controlador atual (skfuzzy, min/max/centróide)",
+        "",
+        f"{'Modo':<12} {'Chamada(µs)':>12} {'Lote(µs/pt)':>12} {'RMS ΔT':>8} "
+        f"{'Máx |ΔT|':>9} {'Méd |ΔP|':>9} {'IAE(°C·h)':>10}",
+    ]
+    for modo in (None,) + MODOS_INFERENCIA:
+        T, P = trajetoria(modo, sp, erro_inicial)
+        dT = T - T_ref
+        lote = latencia_lote(modo) if modo else float("nan")
+        linhas.append(
+            f"{modo or 'skfuzzy':<12} {latencia_chamada(modo):>12.1f} {lote:>12.2f} "
+            f"{np.sqrt(np.mean(dT ** 2)):>8.3f} {np.max(np.abs(dT)):>9.3f} "
+            f"{np.mean(np.abs(P - P_ref)):>9.2f} {np.sum(np.abs(T - sp)) / 60:>10.1f}"
+        )
+    return "\n".join(linhas)
+
+
+if __name__ == "__main__":
+    sp = float(sys.argv[1]) if len(sys.argv) > 1 else 22.0
+    erro_inicial = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    print(relatorio(sp, erro_inicial))
@@ -0,0 +1,210 @@
+# simulacao.py – SIMULAÇÃO DE HORIZONTE LONGO COM CHECKPOINT
+import os
+import glob
+import pickle
+import random
+import threading
+
+import numpy as np
+
+from main import (
+    fuzzy_controller,
+    modelo_fisico,
+    get_temp_externa,
+    get_carga_termica,
+)
+from instrumentacao import Instrumentacao
+
+MINUTOS_DIA = 1440
+CAMPOS = ("t", "T", "pcrac", "ext", "qest")
+ARQ_CHECKPOINT = "checkpoint.pkl"
+
+
+class ArmazenamentoBlocos:
+    """
+    Resultados em blocos preallocados de tamanho fixo (padrão: 1 dia).
+    Com pasta, cada bloco vira bloco_00000.npy; sem pasta, só o bloco
+    atual e o anterior ficam em memória (o suficiente para o gráfico).
+    ultimos() pode ser chamado de outra thread (a GUI): a troca de bloco
+    e a leitura ficam sob o mesmo lock.
+    """
+    def __init__(self, pasta=None, tamanho_bloco=MINUTOS_DIA):
+        self.pasta = pasta
+        self.tamanho_bloco = tamanho_bloco
+        self.buf = np.empty((tamanho_bloco, len(CAMPOS)))
+        self.anterior = self.buf[:0]
+        self.n = 0
+        self.bloco = 0
+        self.lock = threading.Lock()
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+    def _arquivo(self, bloco):
+        return os.path.join(self.pasta, f"bloco_{bloco:05d}.npy")
+
+    def adicionar(self, t, T, pcrac, ext, qest):
+        linha = self.buf[self.n]
+        linha[0] = t
+        linha[1] = T
+        linha[2] = pcrac
+        linha[3] = ext
+        linha[4] = qest
+        self.n += 1
+        if self.n == self.tamanho_bloco:
+            self.descarregar()
+
+    def descarregar(self):
+        """Grava o bloco atual (mesmo parcial); se cheio, passa para o próximo."""
+        if self.pasta and self.n:
+            np.save(self._arquivo(self.bloco), self.buf[:self.n])
+        if self.n == self.tamanho_bloco:
+            novo = np.empty_like(self.buf)
+            with self.lock:
+                self.anterior = self.buf
+                self.buf = novo
+                self.n = 0
+            self.bloco += 1
+
+    def posicionar(self, bloco, n):
+        """Retoma no bloco/linha do checkpoint, recarregando o bloco parcial."""
+        self.bloco = bloco
+        self.n = n
+        if self.pasta and n:
+            self.buf[:n] = np.load(self._arquivo(bloco))[:n]
+        if self.pasta and bloco > 0:
+            self.anterior = np.load(self._arquivo(bloco - 1))
+
+    def ultimos(self, n):
+        """Cópia das últimas n linhas (no máximo atual + anterior)."""
+        with self.lock:
+            atual = self.buf[:self.n]
+            if len(atual) >= n:
+                return atual[-n:].copy()
+            return np.concatenate([self.anterior[len(atual) - n:], atual])
+
+
+def ler_blocos(pasta):
+    """Itera os blocos gravados em ordem, para análise bloco a bloco."""
+    for arq in sorted(glob.glob(os.path.join(pasta, "bloco_*.npy"))):
+        yield np.load(arq)
+
+
+def limpar_pasta(pasta):
+    """Remove blocos e checkpoint de uma simulação anterior."""
+    for arq in glob.glob(os.path.join(pasta, "bloco_*.npy")):
+        os.remove(arq)
+    arq = os.path.join(pasta, ARQ_CHECKPOINT)
+    if os.path.exists(arq):
+        os.remove(arq)
+
+
+def salvar_checkpoint(pasta, estado):
+    # Escrita atômica: um checkpoint interrompido nunca corrompe o anterior
+    tmp = os.path.join(pasta, ARQ_CHECKPOINT + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(estado, f)
+    os.replace(tmp, os.path.join(pasta, ARQ_CHECKPOINT))
+
+
+def carregar_checkpoint(pasta):
+    arq = os.path.join(pasta, ARQ_CHECKPOINT)
+    if not os.path.exists(arq):
+        return None
+    with open(arq, "rb") as f:
+        return pickle.load(f)
+
+
+def simular(sp, erro_inicial=0.0, horizonte=MINUTOS_DIA, pasta=None,
+            armazenamento=None, a_cada=MINUTOS_DIA, retomar=False,
+            semente=None, cache=None, instr=None, modo=None):
+    """
+    Gerador da simulação minuto a minuto, por qualquer horizonte (minutos).
+    Produz (t, T, PCRAC, ext, qest, erro) e grava cada linha no armazenamento.
+
+    Com pasta, o estado (t, T, Prev, e_ant, estado do RNG) é salvo a cada
+    a_cada minutos e ao fechar o gerador; retomar=True continua do último
+    checkpoint da pasta. modo escolhe a inferência (ver main.MODOS_INFERENCIA;
+    None = skfuzzy); um cache, se informado, precisa ter o mesmo modo.
+    """
+    # Valida antes de limpar a pasta: o erro não pode custar o checkpoint
+    if cache is not None and cache.modo != modo:
+        raise ValueError(f"Cache criado para modo={cache.modo!r}, simulação com modo={modo!r}")
+    if instr is None:
+        instr = Instrumentacao(ativo=False)
+    if armazenamento is None:
+        armazenamento = ArmazenamentoBlocos(pasta)
+
+    ckpt = carregar_checkpoint(pasta) if (retomar and pasta) else None
+    if ckpt is not None:
+        sp = ckpt["sp"]
+        horizonte = ckpt["horizonte"]
+        t = ckpt["t"]
+        T = ckpt["T"]
+        Prev = ckpt["Prev"]
+        e_ant = ckpt["e_ant"]
+        random.setstate(ckpt["rng"])
+        armazenamento.posicionar(ckpt["bloco"], ckpt["n"])
+    else:
+        if pasta:
+            limpar_pasta(pasta)
+        if semente is not None:
+            random.seed(semente)
+        # Se Erro = T - Setpoint, então T = Setpoint + Erro
+        t = 0
+        T = sp + erro_inicial
+        Prev = 50.0
+        e_ant = 0
+
+    def checkpoint():
+        armazenamento.descarregar()
+        salvar_checkpoint(pasta, {
+            "sp": sp, "horizonte": horizonte, "t": t, "T": T,
+            "Prev": Prev, "e_ant": e_ant, "rng": random.getstate(),
+            "bloco": armazenamento.bloco, "n": armazenamento.n,
+        })
+
+    try:
+        while t < horizonte:
+            t0 = instr.agora()
+            ext = get_temp_externa(t)
+            qest = get_carga_termica(t)
+            instr.registrar("cenario", t0)
+
+            # CÁLCULO DO ERRO
+            erro = T - sp
+            dE = erro - e_ant
+
+            # Controlador Fuzzy
+            t0 = instr.agora()
+            PCRAC = fuzzy_controller(
+                max(-10, min(10, erro)),
+                max(-2, min(2, dE)),
+                max(10, min(35, ext)),
+                max(0, min(100, qest)),
+                Prev,
+                cache=cache,
+                modo=modo
+            )
+            instr.registrar("fuzzy", t0)
+
+            t0 = instr.agora()
+            T_next = modelo_fisico(T, PCRAC, qest, ext)
+            instr.registrar("modelo", t0)
+
+            armazenamento.adicionar(t, T, PCRAC, ext, qest)
+
+            # Avança o estado antes do yield: se o consumidor parar aqui,
+            # o checkpoint já aponta para o próximo minuto
+            T_atual = T
+            Prev = PCRAC
+            e_ant = erro
+            T = T_next
+            t += 1
+
+            if pasta and t % a_cada == 0:
+                checkpoint()
+
+            yield t - 1, T_atual, PCRAC, ext, qest, erro
+    finally:
+        if pasta:
+            checkpoint()
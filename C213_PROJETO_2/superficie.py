@@ -0,0 +1,184 @@
+# superficie.py – EXPLORADOR DA SUPERFÍCIE DE CONTROLE
+from collections import OrderedDict
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from main import fuzzy_lote, PASSOS_PADRAO, erro_univ, de_univ, text_univ, qest_univ
+from janelas import JanelaInspetor
+
+# Faixas das entradas (mesmas dos universos do controlador)
+FAIXA_ERRO = (erro_univ[0], erro_univ[-1])
+FAIXA_DE = (de_univ[0], de_univ[-1])
+FAIXA_TEXT = (text_univ[0], text_univ[-1])
+FAIXA_QEST = (qest_univ[0], qest_univ[-1])
+
+
+def _grade(faixa, passo):
+    """Índices quantizados (valor = k * passo) das posições do slider."""
+    return np.arange(int(round(faixa[0] / passo)), int(round(faixa[1] / passo)) + 1)
+
+
+class SuperficiesControle:
+    """
+    Superfícies PCRAC pré-calculadas em fatias 2-D via fuzzy_lote:
+      - erro × de   (com text e qest fixos)
+      - text × qest (com erro e de fixos)
+    Os eixos são as próprias posições dos sliders (passos), então o valor
+    no cursor sai da fatia em cache, sem nova inferência.
+    Cada fatia fica num LRU indexado pelas entradas fixas quantizadas; o
+    tamanho padrão comporta as fatias das linhas de todos os sliders que
+    passam pelo ponto atual (ver vizinhas()).
+    """
+    def __init__(self, tamanho=None, passos=PASSOS_PADRAO):
+        self.passos = passos
+        self.grade_erro = _grade(FAIXA_ERRO, passos[0])
+        self.grade_de = _grade(FAIXA_DE, passos[1])
+        self.grade_text = _grade(FAIXA_TEXT, passos[2])
+        self.grade_qest = _grade(FAIXA_QEST, passos[3])
+        self.eixo_erro = self.grade_erro * passos[0]
+        self.eixo_de = self.grade_de * passos[1]
+        self.eixo_text = self.grade_text * passos[2]
+        self.eixo_qest = self.grade_qest * passos[3]
+        if tamanho is None:
+            tamanho = (len(self.grade_erro) + len(self.grade_de)
+                       + len(self.grade_text) + len(self.grade_qest))
+        self.tamanho = tamanho
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _quantizar(self, e, de, Text, Qest):
+        return tuple(int(round(v / p)) for v, p in zip((e, de, Text, Qest), self.passos))
+
+    def _calcular(self, chave):
+        tipo, k1, k2 = chave
+        if tipo == "erro_de":
+            return fuzzy_lote(self.eixo_erro[None, :], self.eixo_de[:, None],
+                              k1 * self.passos[2], k2 * self.passos[3])
+        return fuzzy_lote(k1 * self.passos[0], k2 * self.passos[1],
+                          self.eixo_text[None, :], self.eixo_qest[:, None])
+
+    def _guardar(self, chave, sup):
+        self._cache[chave] = sup
+        if len(self._cache) > self.tamanho:
+            self._cache.popitem(last=False)
+
+    def _obter(self, chave):
+        try:
+            sup = self._cache[chave]
+        except KeyError:
+            self.misses += 1
+            sup = self._calcular(chave)
+            self._guardar(chave, sup)
+            return sup
+        self.hits += 1
+        self._cache.move_to_end(chave)
+        return sup
+
+    def erro_de(self, Text, Qest):
+        """Matriz (de, erro) de PCRAC bruto para text/qest fixos."""
+        _, _, kt, kq = self._quantizar(0, 0, Text, Qest)
+        return self._obter(("erro_de", kt, kq))
+
+    def text_qest(self, e, de):
+        """Matriz (qest, text) de PCRAC bruto para erro/de fixos."""
+        ke, kd, _, _ = self._quantizar(e, de, 0, 0)
+        return self._obter(("text_qest", ke, kd))
+
+    def valor(self, e, de, Text, Qest):
+        """PCRAC bruto no ponto (quantizado), lido da fatia text × qest."""
+        _, _, kt, kq = self._quantizar(e, de, Text, Qest)
+        it = int(np.clip(kt - self.grade_text[0], 0, len(self.grade_text) - 1))
+        iq = int(np.clip(kq - self.grade_qest[0], 0, len(self.grade_qest) - 1))
+        return float(self.text_qest(e, de)[iq, it])
+
+    def vizinhas(self, e, de, Text, Qest):
+        """
+        Chaves das fatias que um arraste de qualquer slider a partir do
+        ponto atual vai pedir, das mais próximas às mais distantes.
+        """
+        ke, kd, kt, kq = self._quantizar(e, de, Text, Qest)
+        linhas = [(abs(k - ke), ("text_qest", k, kd)) for k in self.grade_erro]
+        linhas += [(abs(k - kd), ("text_qest", ke, k)) for k in self.grade_de]
+        linhas += [(abs(k - kt), ("erro_de", k, kq)) for k in self.grade_text]
+        linhas += [(abs(k - kq), ("erro_de", kt, k)) for k in self.grade_qest]
+        linhas.sort(key=lambda d: d[0])
+        return list(dict.fromkeys(chave for _, chave in linhas))
+
+    def pre_calcular(self, chave):
+        """Calcula a fatia se ainda não estiver no cache (não conta como miss)."""
+        if chave in self._cache:
+            return False
+        self._guardar(chave, self._calcular(chave))
+        return True
+
+
+class ExploradorSuperficie(JanelaInspetor):
+    """
+    Janela com as duas superfícies e um cursor na entrada atual.
+    atualizar() só troca os dados da imagem (vindos do cache) e move o
+    cursor; a figura e os artistas são criados uma única vez. Nos ciclos
+    ociosos do Tk, as fatias vizinhas são pré-calculadas uma a uma, então
+    arrastar um slider encontra as fatias já prontas.
+    """
+    titulo = "🗺️ Superfície de Controle"
+    geometria = "1000x520"
+
+    def montar(self, superficies):
+        self.sup = superficies
+        self.fila = iter(())
+        self.job = None
+
+        self.fig = plt.Figure(figsize=(10, 4.5), dpi=100)
+        self.ax_ed = self.fig.add_subplot(121)
+        self.ax_tq = self.fig.add_subplot(122)
+
+        opts = dict(origin="lower", aspect="auto", cmap="coolwarm", vmin=0, vmax=100)
+        self.img_ed = self.ax_ed.imshow(np.zeros((len(superficies.eixo_de), len(superficies.eixo_erro))),
+                                        extent=(*FAIXA_ERRO, *FAIXA_DE), **opts)
+        self.img_tq = self.ax_tq.imshow(np.zeros((len(superficies.eixo_qest), len(superficies.eixo_text))),
+                                        extent=(*FAIXA_TEXT, *FAIXA_QEST), **opts)
+        self.fig.colorbar(self.img_tq, ax=[self.ax_ed, self.ax_tq], label="PCRAC bruto (%)")
+
+        self.cur_ed, = self.ax_ed.plot([0], [0], "kx", markersize=12, mew=2)
+        self.cur_tq, = self.ax_tq.plot([0], [0], "kx", markersize=12, mew=2)
+
+        self.ax_ed.set_xlabel("Erro (e)")
+        self.ax_ed.set_ylabel("Delta Erro (de)")
+        self.ax_tq.set_xlabel("Temp Externa")
+        self.ax_tq.set_ylabel("Carga Térmica (%)")
+
+        self.criar_canvas(self.win)
+
+    def atualizar(self, e, de, Text, Qest, Prev):
+        self.img_ed.set_data(self.sup.erro_de(Text, Qest))
+        self.img_tq.set_data(self.sup.text_qest(e, de))
+        self.cur_ed.set_data([e], [de])
+        self.cur_tq.set_data([Text], [Qest])
+
+        p = self.sup.valor(e, de, Text, Qest)
+        self.ax_ed.set_title(f"erro × de  (Text={Text:.1f}, Qest={Qest:.0f})")
+        self.ax_tq.set_title(f"text × qest  (e={e:.1f}, de={de:.1f})  →  {p:.1f}%")
+        self.canvas.draw_idle()
+
+        # Recomeça o pré-cálculo a partir do novo ponto
+        self.fila = iter(self.sup.vizinhas(e, de, Text, Qest))
+        if self.job is None:
+            self.job = self.win.after_idle(self._pre_calcular)
+
+    def _pre_calcular(self):
+        # Uma fatia por ciclo ocioso (~10 ms), para não travar os sliders
+        self.job = None
+        if not self.existe():
+            return
+        for chave in self.fila:
+            if self.sup.pre_calcular(chave):
+                self.job = self.win.after(1, self._pre_calcular)
+                return
+
+    def fechar(self):
+        if self.job is not None and self.win is not None:
+            self.win.after_cancel(self.job)
+            self.job = None
+        super().fechar()